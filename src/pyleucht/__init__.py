@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from collections.abc import Generator
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RGB:
     r: int
     g: int
@@ -18,34 +18,19 @@ class RGB:
     def to_tuple(self) -> tuple[int, int, int]:
         return (self.r, self.g, self.b)
 
+    def to_bytes(self) -> bytes:
+        """Return the color packed as three bytes in R, G, B order."""
+        return bytes((self.r & 0xFF, self.g & 0xFF, self.b & 0xFF))
+
+    # Resolution of the hue table behind from_hue, a quarter degree per step
+    HUE_STEPS = 1440
+
     @staticmethod
     def from_hue(hue) -> "RGB":
         """Convert hue (0-360) to RGB color."""
-        h = hue / 60.0
-        c = 1.0
-        x = c * (1 - abs(h % 2 - 1))
-        if 0 <= h < 1:
-            r, g, b = c, x, 0
-        elif 1 <= h < 2:
-            r, g, b = x, c, 0
-        elif 2 <= h < 3:
-            r, g, b = 0, c, x
-        elif 3 <= h < 4:
-            r, g, b = 0, x, c
-        elif 4 <= h < 5:
-            r, g, b = x, 0, c
-        elif 5 <= h < 6:
-            r, g, b = c, 0, x
-        else:
-            r, g, b = 0, 0, 0
-
-        m = 0
-        r = int((r + m) * 255)
-        g = int((g + m) * 255)
-        b = int((b + m) * 255)
-        return RGB(r, g, b)
-
-@dataclass
+        return pyleucht.color.hue_table(RGB.HUE_STEPS).rgb(hue)
+
+@dataclass(slots=True)
 class Point:
     x: int
     y: int
@@ -63,10 +48,28 @@ class Point:
                 yield Point(x, y)
 
 class BBox:
+    __slots__ = ("min", "max")
+
     def __init__(self, min: Point, max: Point):
         self.min = min
         self.max = max
 
+    @property
+    def width(self) -> int:
+        return self.max.x - self.min.x
+
+    @property
+    def height(self) -> int:
+        return self.max.y - self.min.y
+
+    def xs(self) -> range:
+        """Column coordinates covered by the box, without allocating a Point per pixel."""
+        return range(self.min.x, self.max.x)
+
+    def ys(self) -> range:
+        """Row coordinates covered by the box, without allocating a Point per pixel."""
+        return range(self.min.y, self.max.y)
+
     def points(self) -> Generator[Point, None, None]:
         for y in range(self.min.y, self.max.y):
             for x in range(self.min.x, self.max.x):
@@ -84,11 +87,20 @@ class BBox:
             float(self.min.y) + (float(self.max.y - self.min.y) / 2.0)
         )
 
+import pyleucht.color
 import pyleucht.font
+import pyleucht.layout
 import pyleucht.button
 import pyleucht.screen
+import pyleucht.blend
+import pyleucht.draw
 import pyleucht.animation
+import pyleucht.stats
+import pyleucht.trace
+import pyleucht.compositor
 import pyleucht.event
 import pyleucht.state
 import pyleucht.app
+import pyleucht.watchdog
+import pyleucht.profiler
 
@@ -1,30 +1,79 @@
 import argparse
+import math
+import signal
+import sys
 import pyleucht as pl
 
 SCREEN_WIDTH = 21
 SCREEN_HEIGHT = 12
 
+def interval(value: str) -> float:
+    seconds = float(value)
+    if not math.isfinite(seconds) or seconds < 0:
+        raise argparse.ArgumentTypeError(f"invalid interval: {value!r}, must be a finite number of seconds >= 0")
+    return seconds
+
 def main():
     parser = argparse.ArgumentParser(description="Pyleucht LED Wall with Wake Word Detection")
     parser.add_argument("--debug", action="store_true", help="Run in debug mode with pygame screen")
+    parser.add_argument("--led-dots", action="store_true", help="Draw LEDs as round dots in debug mode")
     parser.add_argument("--spi-bus", type=int, default=0, help="SPI bus number (default: 0)")
     parser.add_argument("--spi-device", type=int, default=0, help="SPI device number (default: 0)")
     parser.add_argument("--spi-speed", type=int, default=1_000_000, help="SPI speed in Hz (default: 1,000,000)")
+    parser.add_argument("--output-thread", action="store_true", help="Send frames to the LEDs on a background thread while the next frame renders")
+    parser.add_argument("--refresh-interval", type=interval, default=1.0, help="Seconds after which an unchanged frame is sent to the LEDs again (default: 1.0)")
+    parser.add_argument("--layout", choices=["rows", "columns"], default="rows", help="LED wiring direction, starting top-left (default: rows)")
+    parser.add_argument("--no-serpentine", action="store_true", help="Every row/column is wired in the same direction")
+    parser.add_argument("--rotate", type=int, choices=[0, 90, 180, 270], default=0, help="Clockwise rotation of the LED panel in degrees (default: 0)")
+    parser.add_argument("--mirror-x", action="store_true", help="LED panel is mirrored horizontally")
+    parser.add_argument("--mirror-y", action="store_true", help="LED panel is mirrored vertically")
+    parser.add_argument("--layout-file", help="Mapping file for irregular walls, overrides the other layout options")
     parser.add_argument("--fps", type=int, default=30, help="Frame rate in frames per second (default: 30)")
+    parser.add_argument("--low-fps", type=int, default=10, help="Frame rate for slowly changing content (default: 10)")
+    parser.add_argument("--profile", action="store_true", help="Time every animation and print frame timings every few seconds")
+    parser.add_argument("--metrics-port", type=int, help="Serve metrics in the Prometheus text format on this port of localhost")
+    parser.add_argument("--watchdog", type=float, metavar="SECONDS", help="Log all thread stacks when no frame completes for this long, and notify the systemd watchdog")
+    parser.add_argument("--profile-seconds", type=float, default=pl.profiler.DEFAULT_DURATION, help="Seconds to profile after SIGUSR1 or holding the four corner buttons (default: 30)")
+    parser.add_argument("--profile-dir", help="Directory for profile reports (default: the temporary directory)")
+    parser.add_argument("--trace", metavar="PATH", help="Record a timeline of frames, animations, SPI transfers and button events to PATH (Chrome trace event JSON)")
     args = parser.parse_args()
 
+    if args.trace:
+        pl.trace.start(args.trace)
+        # Exit normally on SIGTERM, e.g. from systemd, so that the trace is written
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     if args.debug:
         buttons = pl.button.DebugHandler()
-        ui = pl.screen.Debug(SCREEN_WIDTH, SCREEN_HEIGHT, buttons=buttons)
+        ui = pl.screen.Debug(SCREEN_WIDTH, SCREEN_HEIGHT, buttons=buttons, led_dots=args.led_dots)
     else:
         buttons = pl.button.GPIOHandler(
             gpio_push=["GPIO5", "GPIO6", "GPIO12", "GPIO13", "GPIO19", "GPIO16"],
             gpio_led=["GPIO4", "GPIO17", "GPIO18", "GPIO27", "GPIO22", "GPIO23"],
         )
-        ui = pl.screen.WS2801(SCREEN_WIDTH, SCREEN_HEIGHT, bus=args.spi_bus, device=args.spi_device, speed_hz=args.spi_speed)
+        if args.layout_file:
+            layout = pl.layout.load(args.layout_file, SCREEN_WIDTH, SCREEN_HEIGHT)
+        else:
+            layout = pl.layout.grid(
+                SCREEN_WIDTH, SCREEN_HEIGHT,
+                columns=args.layout == "columns",
+                serpentine=not args.no_serpentine,
+                rotate=args.rotate,
+                mirror_x=args.mirror_x,
+                mirror_y=args.mirror_y,
+            )
+        ui = pl.screen.WS2801(SCREEN_WIDTH, SCREEN_HEIGHT, bus=args.spi_bus, device=args.spi_device, speed_hz=args.spi_speed, layout=layout, threaded=args.output_thread, refresh_interval=args.refresh_interval)
 
     app = pl.app.App(ui, buttons)
-    app.run(fps=args.fps)
+    if args.metrics_port:
+        # Only imported when needed, http.server alone takes longer to import than the rest of the app
+        from pyleucht import metrics
+        metrics.MetricsServer(app, args.metrics_port)
+    if args.watchdog:
+        pl.watchdog.Watchdog(app, stall_after=args.watchdog)
+    pl.profiler.Profiler(app, duration=args.profile_seconds, directory=args.profile_dir).install()
+    pl.watchdog.notify("READY=1")
+    app.run(fps=args.fps, low_fps=args.low_fps, profile=args.profile)
 
 if __name__ == "__main__":
     main()
@@ -5,9 +5,44 @@ An animation is anything that can be drawn to the LED wall over time.
 import pyleucht as pl
 
 from collections.abc import Generator
+import functools
 import math
 
+@functools.lru_cache(maxsize=16)
+def _radial_field(width: int, height: int) -> bytes:
+    '''Hues of ten degrees per pixel of distance to the center of a width x height area'''
+    cx = width / 2.0
+    cy = height / 2.0
+    return pl.color.hue_table().field(math.hypot(x - cx, y - cy) * 10 for y in range(height) for x in range(width))
+
+@functools.lru_cache(maxsize=16)
+def _diagonal_field(width: int, height: int) -> bytes:
+    '''Hues of ten degrees per pixel along both axes of a width x height area'''
+    return pl.color.hue_table().field((x + y) * 10 for y in range(height) for x in range(width))
+
+def _draw_hue_field(screen: type[pl.screen.Base], region: pl.BBox, field: bytes, hue: float):
+    '''Draw a hue field, rotated by hue degrees, to the region of the screen'''
+    screen.blit(region.min, pl.color.hue_table().pack(field, hue), region.width)
+
+
+class Rate:
+    ''' Frame rate an animation needs '''
+    STATIC = 0  # Same pixels on every update
+    LOW = 1     # Slow changes, a reduced frame rate is enough
+    FULL = 2    # Full motion
+
+
 class Base:
+    # True if the animation sets every pixel of its region, hiding everything below
+    opaque = False
+
+    # Bumped by invalidate(), see there
+    version = 0
+
+    # How the animation combines with the animations below, see pl.blend
+    blend = pl.blend.Mode.NORMAL
+    opacity = 1.0
+
     def __init__(self, bbox: pl.BBox = None):
         self.bbox = bbox
 
@@ -19,6 +54,22 @@ class Base:
         '''Called when the animation stops'''
         pass
 
+    def rate(self) -> int:
+        '''Frame rate the animation needs, see Rate'''
+        return Rate.FULL
+
+    def invalidate(self):
+        '''
+        Mark the output of a static animation as changed.
+        Static animations are drawn once and then reused by the compositor
+        until they are invalidated, so call this after changing e.g. a color.
+        '''
+        self.version += 1
+
+    def region(self, screen) -> pl.BBox:
+        '''Area the animation draws to: its bbox, or the whole screen'''
+        return self.bbox or screen.bbox
+
     def points(self, screen) -> Generator[pl.Point, None, None]:
         if self.bbox:
             for point in self.bbox.points():
@@ -27,6 +78,22 @@ class Base:
             for point in screen.points():
                 yield point
 
+    def advance(self, dt: float):
+        '''
+        Advance the animation state without drawing, e.g. while it is hidden.
+
+        :param dt: Time delta since last update in seconds.
+        '''
+        pass
+
+    def draw(self, screen: type[pl.screen.Base]):
+        '''
+        Draw the current animation state to the screen.
+
+        :param screen: The screen object to draw on.
+        '''
+        raise NotImplementedError("Subclasses must implement this method.")
+
     def update(self, screen: type[pl.screen.Base], dt: float):
         '''
         Update the animation state and draw to the screen.
@@ -34,91 +101,168 @@ class Base:
         :param screen: The screen object to draw on.
         :param dt: Time delta since last update in seconds.
         '''
-        raise NotImplementedError("Subclasses must implement this method.")
+        self.advance(dt)
+        self.draw(screen)
 
 
 class FillColor(Base):
+    opaque = True
+
     def __init__(self, color: pl.RGB, *, bbox: pl.BBox = None):
         super().__init__(bbox)
         self.color = color
 
-    def update(self, screen: type[pl.screen.Base], dt: float):
-        for point in self.points(screen):
-            screen.set(point, self.color)
+    @property
+    def color(self) -> pl.RGB:
+        return self._color
+
+    @color.setter
+    def color(self, color: pl.RGB):
+        # Static, so the compositor only draws it again once invalidated
+        self._color = color
+        self.invalidate()
+
+    def rate(self) -> int:
+        return Rate.STATIC
+
+    def draw(self, screen: type[pl.screen.Base]):
+        if not self.bbox:
+            screen.fill(self.color)
+            return
+        screen.fill_rect(self.bbox, self.color)
 
 
 class VLine(Base):
+    opaque = True
+
     def __init__(self, color: pl.RGB, x: int):
         super().__init__()
         self.color = color
         self.x = x
 
-    def update(self, screen: type[pl.screen.Base], dt: float):
-        for y in range(screen.height):
-            screen.set(pl.Point(self.x, y), self.color)
+    @property
+    def color(self) -> pl.RGB:
+        return self._color
+
+    @color.setter
+    def color(self, color: pl.RGB):
+        # Static, so the compositor only draws it again once invalidated
+        self._color = color
+        self.invalidate()
+
+    def rate(self) -> int:
+        return Rate.STATIC
+
+    def region(self, screen) -> pl.BBox:
+        return pl.BBox(pl.Point(self.x, 0), pl.Point(self.x + 1, screen.height))
+
+    def draw(self, screen: type[pl.screen.Base]):
+        screen.fill_rect(self.region(screen), self.color)
 
 
 class RainbowCycle(Base):
+    opaque = True
+
     def __init__(self, speed: float = 1.0, *, bbox: pl.BBox = None):
         super().__init__(bbox)
         self.speed = speed
         self.position = 0.0
 
-    def update(self, screen: type[pl.screen.Base], dt: float):
+    def advance(self, dt: float):
         self.position += self.speed * dt
-        for point in self.points():
-            hue = (self.position + (point.x + point.y) * 10) % 360
-            screen.set(point, pl.RGB.from_hue(hue))
+
+    def draw(self, screen: type[pl.screen.Base]):
+        region = self.region(screen)
+        field = _diagonal_field(region.width, region.height)
+        _draw_hue_field(screen, region, field, self.position + (region.min.x + region.min.y) * 10)
 
 
 class Kaleidoscope(Base):
+    opaque = True
+
     def __init__(self, speed: float = 1.0, *, bbox: pl.BBox = None):
         super().__init__(bbox)
         self.speed = speed
         self.angle = 0.0
 
-    def update(self, screen: type[pl.screen.Base], dt: float):
+    def advance(self, dt: float):
         self.angle += self.speed * dt
-        if self.bbox:
-            center = self.bbox.center_f()
-        else:
-            center = (
-                float(screen.width) / 2.0,
-                float(screen.height) / 2.0,
-            )
-        for point in self.points(screen):
-            dx = float(point.x) - center[0]
-            dy = float(point.y) - center[1]
-            distance = (dx**2 + dy**2) ** 0.5
-            hue = (self.angle + distance * 10) % 360
-            screen.set(point, pl.RGB.from_hue(hue))
+
+    def draw(self, screen: type[pl.screen.Base]):
+        region = self.region(screen)
+        field = _radial_field(region.width, region.height)
+        _draw_hue_field(screen, region, field, self.angle)
+
+
+class ExpandingCircles(Base):
+    '''Rings growing from the center of the region'''
+
+    def __init__(self, color: pl.RGB = pl.RGB(255, 255, 255), speed: float = 4.0, spacing: float = 5.0, *, width: float = 1.0, bbox: pl.BBox = None):
+        '''
+        :param speed: Growth of the rings in pixels per second
+        :param spacing: Distance between two rings in pixels
+        :param width: Ring width in pixels
+        '''
+        super().__init__(bbox)
+        self.color = color
+        self.speed = speed
+        self.spacing = spacing
+        self.width = width
+        self.phase = 0.0
+        self._coverage = None
+
+    def advance(self, dt: float):
+        self.phase = (self.phase + self.speed * dt) % self.spacing
+
+    def draw(self, screen: type[pl.screen.Base]):
+        region = self.region(screen)
+        coverage = self._coverage
+        if coverage is None or (coverage.width, coverage.height) != (region.width, region.height):
+            coverage = self._coverage = pl.draw.Coverage(region.width, region.height)
+        coverage.clear()
+
+        # All rings are collected first and drawn to the screen at once
+        cx = (region.width - 1) / 2
+        cy = (region.height - 1) / 2
+        radius = self.phase
+        while radius < math.hypot(cx, cy) + self.width:
+            coverage.circle(cx, cy, radius, width=self.width)
+            radius += self.spacing
+        coverage.draw(screen, self.color, region.min)
 
 
 class BreathingGlow(Base):
+    opaque = True
+
     def __init__(self, color: pl.RGB = pl.RGB(0, 0, 255), speed: float = 1.0):
         super().__init__()
         self.color = color
         self.speed = speed
         self.phase = 0.0
 
-    def update(self, screen: type[pl.screen.Base], dt: float):
+    def rate(self) -> int:
+        return Rate.LOW
+
+    def advance(self, dt: float):
         self.phase += self.speed * dt
+
+    def draw(self, screen: type[pl.screen.Base]):
         brightness = (1 + math.sin(self.phase)) / 2  # Normalize to [0, 1]
         r = int(self.color.r * brightness)
         g = int(self.color.g * brightness)
         b = int(self.color.b * brightness)
-        for point in self.points(screen):
-            screen.set(point, pl.RGB(r, g, b))
+        screen.fill(pl.RGB(r, g, b))
 
 
 class Text(Base):
-    def __init__(self, text: str, pos: pl.Point, *, initial_wait: float = 0.0, speed: float = 0.0, color: pl.RGB = (255, 255, 255)):
+    def __init__(self, text: str, pos: pl.Point, *, initial_wait: float = 0.0, speed: float = 0.0, color: pl.RGB = pl.RGB(255, 255, 255), font: pl.font.Font = None):
         '''        
         :param text: Text
         :param pos: Top-Left position
         :param initial_wait: seconds to wait before starting to move
         :param speed: pixels in seconds
         :param color: Text color
+        :param font: Font, defaults to pl.font.DEFAULT
         '''
         super().__init__()
         self.text = text
@@ -126,10 +270,18 @@ class Text(Base):
         self.initial_wait = initial_wait
         self.speed = speed
         self.color = color
+        self.font = font
         self.offset = 0.0
-        self.text_width = pl.font.text_width(self.text)
 
-    def update(self, screen: type[pl.screen.Base], dt: float):
+    def rate(self) -> int:
+        return Rate.STATIC if self.speed == 0 else Rate.LOW
+
+    def region(self, screen) -> pl.BBox:
+        bitmap = pl.font.render(self.text, self.font)
+        left = self.pos.x - int(self.offset)
+        return pl.BBox(pl.Point(left, self.pos.y), pl.Point(left + bitmap.width, self.pos.y + len(bitmap.rows)))
+
+    def advance(self, dt: float):
         if self.initial_wait > 0:
             self.initial_wait -= dt
         if self.initial_wait < 0:
@@ -138,22 +290,15 @@ class Text(Base):
         if self.initial_wait == 0:
             self.offset += self.speed * dt
 
+    def draw(self, screen: type[pl.screen.Base]):
+        bitmap = pl.font.render(self.text, self.font)
+
         # Draw visible characters
         draw_x = self.pos.x - int(self.offset)
 
         # if draw_x is less than -|text-width|, reset to screen.w
-        if draw_x < -self.text_width:
-            self.offset -= float(self.text_width) + screen.width
-
-        for ch in self.text:
-            if draw_x >= screen.width:
-                break
-
-            char = pl.font.get_char(ch)
-            self.draw_char(char, pl.Point(draw_x, self.pos.y), screen)
-            draw_x += char.width + 1 # +1 for spacing
+        if draw_x < -bitmap.width:
+            self.offset -= float(bitmap.width) + screen.width
 
-    def draw_char(self, char: pl.font.Char, pos: pl.Point, screen: type[pl.screen.Base]):
-        for point in pl.Point.points(char.width, pl.font.HEIGHT):
-            if char.is_set(point):
-                screen.set(pos + point, self.color)
+        # The screen clips the bitmap to the part visible at the current offset
+        screen.blit_mask(pl.Point(draw_x, self.pos.y), bitmap.rows, self.color)
@@ -1,9 +1,12 @@
 import time
 import queue
+import threading
 import pyleucht as pl
 
 class App:
     MAX_IDLE_FRAMES = 1000
+    INPUT_BOOST = 1.0  # Seconds of full frame rate after input
+    PROFILE_INTERVAL = 10.0  # Seconds between two reports with profile=True
 
     def __init__(self, screen: type[pl.screen.Base], buttons: type[pl.button.HandlerBase]):
         self.screen = screen
@@ -18,42 +21,137 @@ class App:
         self.idle_state = pl.state.Idle(self.screen, self.buttons)
         self.selection_state = pl.state.ProgramSelection(self.screen, self.buttons, list(self.apps.keys()))
         self.state = self.idle_state
+
+        # Frame timings, see pl.stats
+        self.stats = pl.stats.FrameStats()
+        self._input_posted = None  # Earliest post time of the events dispatched since the last frame
+        self.heartbeat = time.perf_counter()  # Time the last frame completed, see pl.watchdog
+        self.loop_thread_id = None  # Thread running the frame loop, see pl.profiler
+        self.max_wait = None  # Seconds between two frames at most, see pl.watchdog
+        for state in (*self.apps.values(), self.idle_state, self.selection_state):
+            state.stats = self.stats
+
         self.state.on_enter()  # Initialize LED state for the initial state
 
-    def run(self, fps: int):
-        '''Run the main application loop at the specified frames per second.'''
-        idle_frames = 0
+    def run(self, fps: int, low_fps: int = 10, profile: bool = False):
+        '''
+        Run the main application loop.
+
+        The frame rate follows what the active state needs: fps for full motion,
+        low_fps for slow changes, and no frames at all while it is static.
+
+        :param fps: Full frame rate in frames per second
+        :param low_fps: Frame rate for states that only change slowly
+        :param profile: Time every animation and print a report of self.stats every PROFILE_INTERVAL seconds
+        '''
+        self.loop_thread_id = threading.get_ident()
         dt = 1.0 / fps
+        low_dt = 1.0 / min(low_fps, fps)
+        idle_timeout = self.MAX_IDLE_FRAMES * dt
+        last_input_time = time.perf_counter()
         next_frame_time = time.perf_counter()
+        frame_dt = dt
+        stats = self.stats
+        stats.detailed = stats.detailed or profile
+        last_frame_start = None
+        last_report_time = time.perf_counter()
         while True:
+            frame_start = time.perf_counter()
+            if last_frame_start is not None:
+                stats.interval.record(frame_start - last_frame_start)
+            last_frame_start = frame_start
+
             # Dispatch events
             while not self.event_queue.empty():
-                event = self.event_queue.get()
-                action, selection = self.state.handle_event(event)
-                if action != pl.state.UserAction.NONE:
-                    self._handle_user_action(action, selection)
-                idle_frames = 0
+                self._dispatch_event(self.event_queue.get())
+                last_input_time = time.perf_counter()
 
             # Update state and screen
-            self.state.update(dt)
+            update_start = time.perf_counter()
+            self.state.update(frame_dt)
+            screen_start = time.perf_counter()
             self.screen.update()
+            frame_time = time.perf_counter()
 
-            # Frame limiting
-            next_frame_time += dt
-            sleep_time = next_frame_time - time.perf_counter()
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-            else:
-                # Frame overrun; skip sleeping
-                next_frame_time = time.perf_counter()
+            stats.update.record(screen_start - update_start)
+            stats.screen.record(frame_time - screen_start)
+            stats.frame.record(frame_time - frame_start)
+            tracer = pl.trace.active
+            if tracer is not None:
+                tracer.span("frame", "frame", frame_start, frame_time)
+                tracer.span(f"{type(self.state).__name__}.update", "state", update_start, screen_start)
+                tracer.span("screen.update", "screen", screen_start, frame_time)
+            stats.frames += 1
+            self.heartbeat = frame_time
+            if self._input_posted is not None:
+                stats.latency.record(frame_time - self._input_posted)
+                self._input_posted = None
+            if profile and frame_time - last_report_time >= self.PROFILE_INTERVAL:
+                last_report_time = frame_time
+                print(stats.report(), flush=True)
 
-            if idle_frames > self.MAX_IDLE_FRAMES:
+            if self.state != self.idle_state and frame_time - last_input_time > idle_timeout:
                 self._change_state(self.idle_state)
+                continue
+
+            rate = self.state.rate()
+            if frame_time - last_input_time < self.INPUT_BOOST:
+                # Stay responsive right after input
+                rate = pl.animation.Rate.FULL
+
+            if rate == pl.animation.Rate.STATIC:
+                # Nothing moves: sleep until input arrives, the frame needs a keep-alive
+                # refresh or the idle timeout is due
+                frame_dt = dt
+                timeout = self.screen.refresh_interval
+                if self.state != self.idle_state:
+                    timeout = min(timeout, last_input_time + idle_timeout - frame_time)
+                if self.screen.poll_interval is not None:
+                    timeout = min(timeout, self.screen.poll_interval)
+                if self.max_wait is not None:
+                    timeout = min(timeout, self.max_wait)
+                # Never wait less than a frame, e.g. with a refresh interval of 0
+                timeout = max(dt, timeout)
+            else:
+                # Frame limiting
+                frame_dt = dt if rate == pl.animation.Rate.FULL else low_dt
+                next_frame_time += frame_dt
+                timeout = next_frame_time - frame_time
+                if timeout <= 0:
+                    # Frame overrun; skip waiting
+                    stats.overruns += 1
+                    next_frame_time = frame_time
+                    continue
+
+            # Wait for the next frame, but wake up right away on input
+            try:
+                event = self.event_queue.get(timeout=max(timeout, 0.0))
+            except queue.Empty:
+                if rate == pl.animation.Rate.STATIC:
+                    next_frame_time = time.perf_counter()
+            else:
+                self._dispatch_event(event)
+                last_input_time = time.perf_counter()
+                frame_dt = min(last_input_time - frame_time, frame_dt)
+                next_frame_time = last_input_time
 
-            idle_frames += 1
+    def _dispatch_event(self, event: type[pl.event.Event]):
+        start = time.perf_counter()
+        if event.posted and (self._input_posted is None or event.posted < self._input_posted):
+            self._input_posted = event.posted
+        action, selection = self.state.handle_event(event)
+        if action != pl.state.UserAction.NONE:
+            self._handle_user_action(action, selection)
+        end = time.perf_counter()
+        self.stats.events.record(end - start)
+        tracer = pl.trace.active
+        if tracer is not None:
+            tracer.flow(repr(event), "input", event.posted or start, start)
+            tracer.span(f"dispatch {repr(event)}", "input", start, end)
 
     def post_event(self, event: type[pl.event.Event]):
         '''Post an event to the application's event queue.'''
+        event.posted = time.perf_counter()
         self.event_queue.put(event)
 
     def _handle_user_action(self, action, selection):
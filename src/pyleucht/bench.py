@@ -0,0 +1,182 @@
+'''
+Frame timing benchmark for animations, states and LED packing.
+
+Every case draws frames to a headless screen at several wall sizes and
+reports the mean, 99th percentile and maximum time per frame, and the
+memory allocated per frame. Results can be saved as JSON and compared
+with an earlier run:
+
+    python -m pyleucht.bench --json before.json
+    python -m pyleucht.bench --compare before.json
+'''
+
+import argparse
+import inspect
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import pyleucht as pl
+
+DEFAULT_SIZES = "21x12,64x32,128x64,256x128"
+DEFAULT_FRAMES = 200
+WARMUP_FRAMES = 5
+FRAME_DT = 1.0 / 30
+
+# Frame budget of a Pi Zero at 30 frames per second
+DEFAULT_BUDGET_MS = 1000.0 / 30
+
+# Arguments for animations that cannot be constructed without any
+_ANIMATION_FACTORIES = {
+    "FillColor": lambda width, height: pl.animation.FillColor(pl.RGB(255, 0, 0)),
+    "VLine": lambda width, height: pl.animation.VLine(pl.RGB(255, 255, 255), width // 2),
+    "Text": lambda width, height: pl.animation.Text("Tischtennis", pl.Point(0, height // 2 - 2), speed=8.0),
+}
+
+def _animation_cases():
+    for name, cls in inspect.getmembers(pl.animation, inspect.isclass):
+        if issubclass(cls, pl.animation.Base) and cls is not pl.animation.Base:
+            factory = _ANIMATION_FACTORIES.get(name, lambda width, height, cls=cls: cls())
+            yield f"animation.{name}", lambda screen, factory=factory: _animation_frame(screen, factory(screen.width, screen.height))
+
+def _animation_frame(screen: pl.screen.Headless, animation: type[pl.animation.Base]):
+    def frame():
+        animation.update(screen, FRAME_DT)
+        screen.update()
+    return frame
+
+def _state_cases():
+    states = {
+        "Idle": lambda screen, buttons: pl.state.Idle(screen, buttons),
+        "ProgramSelection": lambda screen, buttons: pl.state.ProgramSelection(screen, buttons, ["Tischtennis", "Animationen"]),
+        "TableTennis": lambda screen, buttons: pl.state.TableTennis(screen, buttons),
+        "Animations": lambda screen, buttons: pl.state.Animations(screen, buttons),
+    }
+    for name, factory in states.items():
+        yield f"state.{name}", lambda screen, factory=factory: _state_frame(screen, factory(screen, pl.button.DebugHandler()))
+
+def _state_frame(screen: pl.screen.Headless, state: type[pl.state.Base]):
+    state.on_enter()
+    def frame():
+        state.update(FRAME_DT)
+        screen.update()
+    return frame
+
+def _pack_frame(screen: pl.screen.Headless):
+    screen = pl.screen.Headless(screen.width, screen.height, layout=pl.layout.grid(screen.width, screen.height))
+    pl.animation.Kaleidoscope().draw(screen)
+    return screen.show
+
+def cases() -> list[tuple[str, callable]]:
+    '''All benchmark cases as (name, setup), where setup(screen) returns the function drawing one frame'''
+    return [*_animation_cases(), *_state_cases(), ("ws2801.pack", _pack_frame)]
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    index = min(len(sorted_values) - 1, round(percent / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+def measure(setup, width: int, height: int, frames: int) -> dict:
+    '''Time frames of a single case on a headless width x height screen'''
+    frame = setup(pl.screen.Headless(width, height))
+    for _ in range(WARMUP_FRAMES):
+        frame()
+
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter_ns()
+        frame()
+        times.append(time.perf_counter_ns() - start)
+
+    # Allocations are measured in a separate pass, tracing slows down every allocation
+    peaks = []
+    tracemalloc.start()
+    retained = tracemalloc.get_traced_memory()[0]
+    for _ in range(frames):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        frame()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    retained = tracemalloc.get_traced_memory()[0] - retained
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        "mean_ms": sum(times) / len(times) / 1e6,
+        "p99_ms": _percentile(times, 99) / 1e6,
+        "max_ms": times[-1] / 1e6,
+        "alloc_peak_bytes": sum(peaks) // len(peaks),
+        "alloc_retained_bytes": retained,
+    }
+
+def run(sizes: list[tuple[int, int]], frames: int, selected: str = None, out=sys.stdout) -> list[dict]:
+    results = []
+    print(f"{'case':<28} {'size':>8} {'mean ms':>9} {'p99 ms':>9} {'max ms':>9} {'alloc/frame':>12}", file=out)
+    for name, setup in cases():
+        if selected and selected not in name:
+            continue
+        for width, height in sizes:
+            result = {"case": name, "width": width, "height": height, **measure(setup, width, height, frames)}
+            results.append(result)
+            print(
+                f"{name:<28} {width:>4}x{height:<3} {result['mean_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+                f"{result['max_ms']:>9.3f} {result['alloc_peak_bytes']:>12}",
+                file=out,
+            )
+    return results
+
+def compare(results: list[dict], baseline: list[dict], out=sys.stdout):
+    '''Print the change of the p99 frame time against an earlier run'''
+    before = {(r["case"], r["width"], r["height"]): r for r in baseline}
+    print(f"\n{'case':<28} {'size':>8} {'p99 before':>11} {'p99 now':>9} {'change':>8}", file=out)
+    for result in results:
+        old = before.get((result["case"], result["width"], result["height"]))
+        if old is None:
+            continue
+        change = (result["p99_ms"] - old["p99_ms"]) / old["p99_ms"] * 100 if old["p99_ms"] else 0.0
+        print(
+            f"{result['case']:<28} {result['width']:>4}x{result['height']:<3} "
+            f"{old['p99_ms']:>11.3f} {result['p99_ms']:>9.3f} {change:>+7.1f}%",
+            file=out,
+        )
+
+def _size(text: str) -> tuple[int, int]:
+    width, _, height = text.partition("x")
+    return int(width), int(height)
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark frame times of animations, states and LED packing")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma separated wall sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help=f"Frames per case and size (default: {DEFAULT_FRAMES})")
+    parser.add_argument("--case", help="Only run cases whose name contains this text, e.g. 'state.'")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_MS, help=f"Frame budget in milliseconds (default: {DEFAULT_BUDGET_MS:.1f})")
+    parser.add_argument("--json", help="Save the results to this file")
+    parser.add_argument("--compare", help="Compare with results saved by an earlier run")
+    args = parser.parse_args(argv)
+
+    sizes = [_size(size) for size in args.sizes.split(",")]
+    results = run(sizes, args.frames, args.case)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "frames": args.frames,
+                "budget_ms": args.budget,
+                "results": results,
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f)["results"])
+
+    over = [r for r in results if r["p99_ms"] > args.budget]
+    for r in over:
+        print(f"over budget: {r['case']} at {r['width']}x{r['height']} ({r['p99_ms']:.1f} ms > {args.budget:.1f} ms)")
+    return 1 if over else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+'''
+Blend modes for compositing a layer onto a screen.
+
+Every mode is compiled into a lookup table indexing (source, destination)
+byte pairs, so a whole frame is blended in one pass over the buffer instead
+of per-pixel Python arithmetic. Opacity and antialiasing coverage are applied
+with a single fade table shared by all modes and colors, which keeps the
+tables at a few of 64 KiB each.
+'''
+
+import functools
+import sys
+
+import pyleucht as pl
+
+class Mode:
+    ''' How layer pixels combine with the pixels below '''
+    NORMAL = 0    # Layer replaces what is below, faded by its opacity
+    ADD = 1       # Sum, clamped to white
+    MULTIPLY = 2  # Product, darkens
+    SCREEN = 3    # Inverse product of the inverses, lightens
+    MAX = 4       # Brighter of both, per channel
+
+_INVERT = bytes(range(255, -1, -1))  # Translate table for 255 - byte
+
+# Tables are built one row of 256 entries at a time, with every entry in a
+# 32 bit lane of a single integer, so that a row takes a few integer
+# operations instead of 256 evaluations.
+_LANES = int.from_bytes(b"\x01\0\0\0" * 256, "little")  # 1 in every lane
+_DESTINATIONS = int.from_bytes(b"".join(d.to_bytes(4, "little") for d in range(256)), "little")
+
+def _row(lanes: int) -> bytes:
+    return lanes.to_bytes(1024, "little")[0::4]
+
+def _divide255(lanes: int) -> int:
+    '''Floor division of every lane by 255, exact for lanes below 65536'''
+    return (lanes * 257 + _LANES * 257) >> 16
+
+@functools.cache
+def _table(mode: int) -> bytes:
+    '''Result byte for every (source << 8 | destination) pair'''
+    if mode == Mode.NORMAL:
+        rows = (bytes([s]) * 256 for s in range(256))
+    elif mode == Mode.ADD:
+        rows = (bytes(range(s, 256)) + b"\xff" * s for s in range(256))
+    elif mode == Mode.MAX:
+        rows = (bytes([s]) * s + bytes(range(s, 256)) for s in range(256))
+    elif mode == Mode.MULTIPLY:
+        rows = (_row(_divide255(_DESTINATIONS * s)) for s in range(256))
+    elif mode == Mode.SCREEN:
+        # 255 - (255 - s) * (255 - d) // 255, the product of the inverses reversed and inverted
+        rows = (_row(_divide255(_DESTINATIONS * (255 - s)))[::-1].translate(_INVERT) for s in range(256))
+    else:
+        raise ValueError(f"Unknown blend mode {mode}")
+    return b"".join(rows)
+
+@functools.cache
+def _fade_table() -> bytes:
+    '''Rounded d * (255 - alpha) / 255 for every (alpha << 8 | destination) pair'''
+    return b"".join(_row(_divide255(_DESTINATIONS * (255 - a) + _LANES * 127)) for a in range(256))
+
+@functools.lru_cache(maxsize=256)
+def _scale(alpha: int) -> bytes:
+    '''Translate table for rounded byte * alpha / 255'''
+    return _row(_divide255(_DESTINATIONS * alpha + _LANES * 127))
+
+@functools.cache
+def over_table() -> bytes:
+    '''
+    Weight of a color drawn over a partly covered pixel for every
+    (resulting coverage << 8 | coverage of the color) pair, so that
+    mixing by the weight keeps the color straight, i.e. not premultiplied.
+    '''
+    return bytes([0] * 256) + b"".join(
+        bytes(min(255, (a * 255 + covered // 2) // covered) for a in range(256))
+        for covered in range(1, 256)
+    )
+
+def lookup(table: bytes, high: bytes, low: bytes) -> bytes:
+    '''
+    Map every byte pair of two equally long buffers through a table of
+    65536 entries indexed by (high << 8 | low), in a single pass.
+    '''
+    # Interleave both buffers so that every 16 bit word reads (high << 8 | low)
+    pairs = bytearray(2 * len(low))
+    if sys.byteorder == "little":
+        pairs[0::2] = low
+        pairs[1::2] = high
+    else:
+        pairs[0::2] = high
+        pairs[1::2] = low
+    return bytes(map(table.__getitem__, memoryview(pairs).cast("H")))
+
+def tint(dst: bytes, alpha: bytes, value: int) -> bytes:
+    '''Draw the byte value over every byte of dst by the alpha byte at the same position'''
+    return lookup(_table(Mode.ADD), alpha.translate(_scale(value)), lookup(_fade_table(), alpha, dst))
+
+def mix(dst: bytes, src: bytes, alpha: bytes) -> bytes:
+    '''Mix every byte of src over dst by the alpha byte at the same position'''
+    faded = _fade_table()
+    return lookup(_table(Mode.ADD), lookup(faded, alpha.translate(_INVERT), src), lookup(faded, alpha, dst))
+
+def apply(screen: type[pl.screen.Base], layer: pl.screen.Layer, mode: int, opacity: float = 1.0, rows: range = None):
+    '''
+    Blend the drawn pixels of layer onto screen.
+
+    :param mode: Blend mode, see Mode
+    :param opacity: Layer opacity from 0 to 1
+    :param rows: Rows to blend, all rows by default
+    '''
+    alpha = round(max(0.0, min(1.0, opacity)) * 255)
+    if alpha == 0:
+        return
+    if mode == Mode.NORMAL and alpha == 255:
+        layer.composite(screen)
+        return
+
+    stride = screen.width * 3
+    if rows is None:
+        rows = range(screen.height)
+    start = rows.start * stride
+    stop = rows.stop * stride
+    if start >= stop:
+        return
+
+    dst = screen.frame[start:stop]
+    src = layer.frame[start:stop]
+
+    blended = lookup(_table(mode), src, dst)
+    if alpha < 255:
+        blended = lookup(_table(Mode.ADD), blended.translate(_scale(alpha)), dst.translate(_scale(255 - alpha)))
+
+    if layer.partial:
+        # Antialiased layer, mix by its coverage
+        screen.frame[start:stop] = mix(dst, blended, layer.mask[start:stop])
+        return
+
+    # Keep the destination wherever the layer did not draw
+    mask = int.from_bytes(layer.mask[start:stop], "little")
+    frame = (int.from_bytes(blended, "little") & mask) | (int.from_bytes(dst, "little") & ~mask)
+    screen.frame[start:stop] = frame.to_bytes(len(dst), "little")
@@ -50,11 +50,11 @@ class GPIOHandler(HandlerBase):
         self._leds = []
         if self._gpio_available:
             # Setup buttons and LEDs
+            # Callbacks get the button index (BUTTON_*), like with DebugHandler, not the pin
             for i in range(6):
-                button_id = self._gpio_push[i]
-                button = gpiozero.Button(button_id)
-                button.when_pressed = lambda bid=button_id: self.callback(bid, pressed=True)
-                button.when_released = lambda bid=button_id: self.callback(bid, pressed=False)
+                button = gpiozero.Button(self._gpio_push[i])
+                button.when_pressed = lambda bid=i: self.callback(bid, pressed=True)
+                button.when_released = lambda bid=i: self.callback(bid, pressed=False)
                 self._buttons.append(button)
                 self._leds.append(gpiozero.LED(self._gpio_led[i]))
 
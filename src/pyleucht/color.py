@@ -0,0 +1,104 @@
+'''
+Color conversion backed by precomputed lookup tables.
+
+Hues are quantized to a fixed number of steps per turn. A field of hue steps
+(one per pixel) converts to packed RGB bytes in a few bytes.translate calls.
+'''
+
+import functools
+from array import array
+
+import pyleucht as pl
+
+def hue_to_rgb(hue: float) -> tuple[int, int, int]:
+    '''Convert hue (0-360) to a fully saturated RGB color.'''
+    h = hue / 60.0
+    c = 1.0
+    x = c * (1 - abs(h % 2 - 1))
+    if 0 <= h < 1:
+        r, g, b = c, x, 0
+    elif 1 <= h < 2:
+        r, g, b = x, c, 0
+    elif 2 <= h < 3:
+        r, g, b = 0, c, x
+    elif 3 <= h < 4:
+        r, g, b = 0, x, c
+    elif 4 <= h < 5:
+        r, g, b = x, 0, c
+    elif 5 <= h < 6:
+        r, g, b = c, 0, x
+    else:
+        r, g, b = 0, 0, 0
+
+    return int(r * 255), int(g * 255), int(b * 255)
+
+
+@functools.lru_cache(maxsize=64)
+def _saturation_value_table(saturation: float, value: float) -> bytes:
+    '''Translate table applying saturation and value (0-1) to a fully saturated channel'''
+    return bytes(int(value * (255 - saturation * (255 - c))) for c in range(256))
+
+
+class HueTable:
+    '''Hue to RGB lookup table with a fixed number of steps per turn'''
+
+    def __init__(self, steps: int = 256):
+        if not 1 <= steps <= 0x10000:
+            raise ValueError(f"Unsupported number of hue steps: {steps}")
+        self.steps = steps
+        rgb = [hue_to_rgb(step * 360.0 / steps) for step in range(steps)]
+        self.colors = tuple(pl.RGB(*c) for c in rgb)
+        self.channels = tuple(bytes(c[channel] for c in rgb) for channel in range(3))
+
+    def step(self, hue: float) -> int:
+        '''Return the table index closest to hue (degrees, any range)'''
+        return round(hue % 360 * self.steps / 360) % self.steps
+
+    def rgb(self, hue: float) -> pl.RGB:
+        return self.colors[self.step(hue)]
+
+    def hsv(self, hue: float, saturation: float = 1.0, value: float = 1.0) -> pl.RGB:
+        color = self.rgb(hue)
+        if saturation == 1.0 and value == 1.0:
+            return color
+        table = _saturation_value_table(saturation, value)
+        return pl.RGB(table[color.r], table[color.g], table[color.b])
+
+    def field(self, hues) -> bytes | array:
+        '''
+        Convert an iterable of hues (degrees) to a field of table indices for pack().
+        Fields are bytes for up to 256 steps and unsigned 16 bit arrays otherwise.
+        '''
+        steps = map(self.step, hues)
+        if self.steps <= 256:
+            return bytes(steps)
+        return array("H", steps)
+
+    def pack(self, field: bytes | array, hue: float = 0.0, saturation: float = 1.0, value: float = 1.0) -> bytearray:
+        '''
+        Convert a field of table indices to packed RGB bytes.
+
+        :param field: Table indices as returned by field()
+        :param hue: Degrees added to every hue of the field
+        :param saturation: Saturation (0-1) applied to every pixel
+        :param value: Value (0-1) applied to every pixel
+        '''
+        shift = self.step(hue)
+        apply_sv = saturation != 1.0 or value != 1.0
+        packed = bytearray(len(field) * 3)
+        for channel, table in enumerate(self.channels):
+            # Rotating the table adds the hue to every index of the field
+            table = table[shift:] + table[:shift]
+            if apply_sv:
+                table = table.translate(_saturation_value_table(saturation, value))
+            if self.steps <= 256:
+                packed[channel::3] = field.translate(table.ljust(256, b"\0"))
+            else:
+                packed[channel::3] = bytes(map(table.__getitem__, field))
+        return packed
+
+
+@functools.lru_cache(maxsize=8)
+def hue_table(steps: int = 256) -> HueTable:
+    '''Return the shared hue table with the given resolution'''
+    return HueTable(steps)
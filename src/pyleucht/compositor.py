@@ -0,0 +1,271 @@
+'''
+The compositor draws the animations of a state on top of each other, bottom
+first, and skips the work that would be painted over anyway:
+
+* Animations whose region is off-screen or fully covered by opaque
+  animations above them only advance their state, without drawing.
+* Consecutive fills of the same color that together form a rectangle are
+  drawn as a single fill.
+* Consecutive static animations are drawn once into an off-screen layer,
+  which is copied to the screen until one of them is invalidated.
+* Animations with a blend mode or opacity are drawn into an off-screen
+  layer, which is blended onto the screen in one pass (see pl.blend).
+
+The resulting draw plan is kept until the stack, a region or a fill color
+changes. Layers outlive the plan as long as their animations and regions do,
+so a scrolling text on top of a static background does not redraw the
+background into a fresh layer every frame.
+'''
+
+import time
+
+import pyleucht as pl
+
+def _clip(bbox: pl.BBox, screen: type[pl.screen.Base]) -> tuple[int, int, int, int] | None:
+    x0 = max(bbox.min.x, 0)
+    y0 = max(bbox.min.y, 0)
+    x1 = min(bbox.max.x, screen.width)
+    y1 = min(bbox.max.y, screen.height)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return (x0, y0, x1, y1)
+
+def _subtract(rect: tuple[int, int, int, int], hole: tuple[int, int, int, int]) -> list[tuple[int, int, int, int]]:
+    '''Return the parts of rect outside of hole, as up to four rectangles'''
+    x0, y0, x1, y1 = rect
+    hx0, hy0, hx1, hy1 = hole
+    if hx0 >= x1 or hx1 <= x0 or hy0 >= y1 or hy1 <= y0:
+        return [rect]
+    parts = []
+    if hy0 > y0:
+        parts.append((x0, y0, x1, hy0))
+    if hy1 < y1:
+        parts.append((x0, hy1, x1, y1))
+    top = max(y0, hy0)
+    bottom = min(y1, hy1)
+    if hx0 > x0:
+        parts.append((x0, top, hx0, bottom))
+    if hx1 < x1:
+        parts.append((hx1, top, x1, bottom))
+    return parts
+
+def _covered(rect: tuple[int, int, int, int], holes: list[tuple[int, int, int, int]]) -> bool:
+    '''True if the union of holes covers rect'''
+    remaining = [rect]
+    for hole in holes:
+        remaining = [part for r in remaining for part in _subtract(r, hole)]
+        if not remaining:
+            return True
+    return False
+
+def _union(a: tuple[int, int, int, int], b: tuple[int, int, int, int]) -> tuple[int, int, int, int] | None:
+    '''Return the union of two rectangles if it is a rectangle itself'''
+    ax0, ay0, ax1, ay1 = a
+    bx0, by0, bx1, by1 = b
+    if ay0 == by0 and ay1 == by1 and ax0 <= bx1 and bx0 <= ax1:
+        return (min(ax0, bx0), ay0, max(ax1, bx1), ay1)
+    if ax0 == bx0 and ax1 == bx1 and ay0 <= by1 and by0 <= ay1:
+        return (ax0, min(ay0, by0), ax1, max(ay1, by1))
+    return None
+
+
+class _StaticGroup:
+    '''Consecutive static animations, drawn once into an off-screen layer'''
+
+    def __init__(self, animations: list[type[pl.animation.Base]]):
+        self.animations = animations
+        self.name = "+".join(type(animation).__name__ for animation in animations)
+        self.layer = None
+        self.versions = None
+
+    def advance(self, dt: float):
+        for animation in self.animations:
+            animation.advance(dt)
+
+    def update(self, screen: type[pl.screen.Base], dt: float):
+        versions = tuple(animation.version for animation in self.animations)
+        if self.layer is None or versions != self.versions:
+            self.versions = versions
+            if self.layer is None:
+                self.layer = pl.screen.Layer(screen.width, screen.height)
+            self.layer.clear()
+            for animation in self.animations:
+                animation.update(self.layer, dt)
+        else:
+            self.advance(dt)
+        self.layer.composite(screen)
+
+
+class _BlendedLayer:
+    '''An animation drawn into an off-screen layer and blended onto the screen'''
+
+    def __init__(self, animation: type[pl.animation.Base], region: tuple[int, int, int, int]):
+        self.animation = animation
+        self.name = type(animation).__name__
+        self.region = region
+        self.rows = range(region[1], region[3])
+        self.layer = None
+        self.version = None
+
+    def move(self, region: tuple[int, int, int, int]):
+        if region != self.region:
+            self.region = region
+            self.rows = range(region[1], region[3])
+            self.version = None
+
+    def advance(self, dt: float):
+        self.animation.advance(dt)
+
+    def update(self, screen: type[pl.screen.Base], dt: float):
+        animation = self.animation
+        # Static animations are only drawn again after they were invalidated
+        if self.layer is None or animation.version != self.version or animation.rate() != pl.animation.Rate.STATIC:
+            self.version = animation.version
+            if self.layer is None:
+                self.layer = pl.screen.Layer(screen.width, screen.height)
+            self.layer.clear()
+            animation.update(self.layer, dt)
+        else:
+            animation.advance(dt)
+        pl.blend.apply(screen, self.layer, animation.blend, animation.opacity, self.rows)
+
+
+def _is_blended(animation: type[pl.animation.Base]) -> bool:
+    return animation.blend != pl.blend.Mode.NORMAL or animation.opacity < 1.0
+
+
+class Compositor:
+    def __init__(self):
+        self._key = None
+        self._plan = []
+        self._names = []  # Per plan step, for stats
+        # Layers and merged fills of the current plan, reused by the next one
+        self._groups = {}   # Tuple of (animation, region) per member to _StaticGroup
+        self._blended = {}  # Animation to _BlendedLayer
+        self._fills = {}    # (color, region) to merged FillColor
+
+    def update(self, screen: type[pl.screen.Base], animations: list[type[pl.animation.Base]], dt: float,
+               stats: pl.stats.FrameStats = None):
+        '''
+        Advance all animations by dt and draw the visible ones to the screen.
+
+        :param stats: Record the time taken, per animation if stats.detailed
+        '''
+        start = time.perf_counter()
+        regions = [_clip(animation.region(screen), screen) for animation in animations]
+        key = tuple(
+            (
+                animation,
+                region,
+                animation.color if type(animation) is pl.animation.FillColor else None,
+                animation.blend,
+                animation.opacity < 1.0,
+            )
+            for animation, region in zip(animations, regions)
+        )
+        if key != self._key:
+            self._key = key
+            self._plan = self._build_plan(animations, regions)
+            self._names = [step.name if isinstance(step, (_StaticGroup, _BlendedLayer)) else type(step).__name__ for step, _ in self._plan]
+
+        tracer = pl.trace.active
+        if (stats is not None and stats.detailed) or tracer is not None:
+            self._update_timed(screen, dt, stats if stats is not None and stats.detailed else None, tracer)
+        else:
+            for animation, visible in self._plan:
+                if visible:
+                    animation.update(screen, dt)
+                else:
+                    animation.advance(dt)
+
+        if stats is not None:
+            stats.compositor.record(time.perf_counter() - start)
+
+    def _update_timed(self, screen: type[pl.screen.Base], dt: float, stats: pl.stats.FrameStats, tracer: pl.trace.Tracer):
+        for (animation, visible), name in zip(self._plan, self._names):
+            start = time.perf_counter()
+            if visible:
+                animation.update(screen, dt)
+            else:
+                animation.advance(dt)
+            end = time.perf_counter()
+            if stats is not None:
+                stats.animation(name).record(end - start)
+            if tracer is not None:
+                tracer.span(name if visible else f"{name} (hidden)", "animation", start, end)
+
+    def _build_plan(self, animations: list[type[pl.animation.Base]], regions: list) -> list[tuple[type[pl.animation.Base], bool]]:
+        # Walk from the top down, collecting the opaque regions that hide lower layers
+        visible = [False] * len(animations)
+        opaque = []
+        for i in reversed(range(len(animations))):
+            region = regions[i]
+            if region is None or _covered(region, opaque):
+                continue
+            visible[i] = True
+            if animations[i].opaque and not _is_blended(animations[i]):
+                opaque.append(region)
+
+        blended = {}
+        fills = {}
+        plan = []
+        fill = None  # (color, region) of the fill drawn last, if it may still grow
+        fill_index = None  # Its position in the plan
+        for animation, region, is_visible in zip(animations, regions, visible):
+            if not is_visible:
+                plan.append((animation, False))
+                continue
+
+            if _is_blended(animation):
+                fill = None
+                layer = self._blended.get(animation)
+                if layer is None:
+                    layer = _BlendedLayer(animation, region)
+                else:
+                    layer.move(region)
+                blended[animation] = layer
+                plan.append((layer, True))
+                continue
+
+            if type(animation) is pl.animation.FillColor:
+                merged = _union(fill[1], region) if fill and fill[0] == animation.color else None
+                if merged:
+                    fill = (animation.color, merged)
+                    fills[fill] = self._fills.get(fill) or self._fill(fill)
+                    plan[fill_index] = (fills[fill], True)
+                    continue
+                fill = (animation.color, region)
+                fill_index = len(plan)
+                plan.append((animation, True))
+                continue
+
+            fill = None
+            plan.append((animation, True))
+
+        self._blended = blended
+        self._fills = fills
+        return self._group_static(plan, dict(zip(animations, regions)))
+
+    def _group_static(self, plan: list, regions: dict) -> list:
+        '''Replace runs of visible static animations with cached groups'''
+        groups = {}
+        grouped = []
+        run = []
+        for step, visible in plan + [(None, True)]:
+            if visible and isinstance(step, pl.animation.Base) and step.rate() == pl.animation.Rate.STATIC:
+                run.append(step)
+                continue
+            if run:
+                key = tuple((animation, regions.get(animation)) for animation in run)
+                groups[key] = self._groups.get(key) or _StaticGroup(run)
+                grouped.append((groups[key], True))
+                run = []
+            if step is not None:
+                grouped.append((step, visible))
+        self._groups = groups
+        return grouped
+
+    @staticmethod
+    def _fill(fill: tuple[pl.RGB, tuple[int, int, int, int]]) -> pl.animation.FillColor:
+        color, (x0, y0, x1, y1) = fill
+        return pl.animation.FillColor(color, bbox=pl.BBox(pl.Point(x0, y0), pl.Point(x1, y1)))
@@ -0,0 +1,229 @@
+'''
+Rasterization of lines, circles and polygons.
+
+Shapes are not drawn pixel by pixel. They are rasterized into a Coverage,
+which holds an alpha value per pixel, and any number of shapes can be
+collected before the coverage is drawn to a screen in a single pass (see
+pl.screen.Base.blit_alpha). Overlapping shapes keep the higher alpha, so
+shapes of the same color merge without darker seams.
+
+Pixel centers are at integer coordinates. All shapes are antialiased by
+their coverage of each pixel unless antialias=False is given.
+'''
+
+import math
+
+import pyleucht as pl
+
+# Sub-scanlines per pixel row when filling antialiased polygons
+POLYGON_SAMPLES = 4
+
+class Coverage:
+    '''Alpha per pixel of a width x height area, collected from shapes'''
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.alpha = bytearray(width * height)
+        self._rows = None  # (first, stop) of the rows covered since clear(), if any
+
+    def clear(self):
+        if self._rows:
+            first, stop = self._rows
+            self.alpha[first * self.width:stop * self.width] = bytes((stop - first) * self.width)
+        self._rows = None
+
+    def draw(self, screen: type[pl.screen.Base], color: pl.RGB, pos: pl.Point = None):
+        '''Draw color with the collected coverage to screen, top-left corner at pos'''
+        if not self._rows:
+            return
+        pos = pos or pl.Point(0, 0)
+        first, stop = self._rows
+        screen.blit_alpha(pl.Point(pos.x, pos.y + first), self.alpha[first * self.width:stop * self.width], self.width, color)
+
+    def plot(self, x: int, y: int, alpha: float = 1.0):
+        '''Cover a single pixel with alpha (0-1)'''
+        if 0 <= x < self.width and 0 <= y < self.height:
+            value = round(min(max(alpha, 0.0), 1.0) * 255)
+            i = y * self.width + x
+            if value > self.alpha[i]:
+                self.alpha[i] = value
+                self._touch(y, y + 1)
+
+    def line(self, x0: float, y0: float, x1: float, y1: float, *, width: float = 1.0, antialias: bool = True):
+        '''Line from (x0, y0) to (x1, y1), drawn as a stroke if it is wider than a pixel'''
+        if width > 1.0:
+            self.stroke([(x0, y0), (x1, y1)], width, antialias=antialias)
+        elif antialias:
+            self._wu(x0, y0, x1, y1)
+        else:
+            self._bresenham(round(x0), round(y0), round(x1), round(y1))
+
+    def stroke(self, points: list[tuple[float, float]], width: float, *, closed: bool = False, antialias: bool = True):
+        '''Thick polyline through points, with round joins'''
+        if closed:
+            points = list(points) + [points[0]]
+        half = width / 2
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            length = math.hypot(x1 - x0, y1 - y0)
+            if length == 0:
+                continue
+            nx = -(y1 - y0) / length * half
+            ny = (x1 - x0) / length * half
+            self.polygon([(x0 + nx, y0 + ny), (x1 + nx, y1 + ny), (x1 - nx, y1 - ny), (x0 - nx, y0 - ny)], antialias=antialias)
+        joins = points[:-1] if closed else points[1:-1]
+        for x, y in joins:
+            self.disc(x, y, half, antialias=antialias)
+
+    def circle(self, cx: float, cy: float, radius: float, *, width: float = 1.0, antialias: bool = True):
+        '''Outline of a circle, width pixels thick'''
+        half = width / 2
+        self._radial(cx, cy, radius + half, lambda d: half + 0.5 - abs(d - radius), antialias)
+
+    def disc(self, cx: float, cy: float, radius: float, *, antialias: bool = True):
+        '''Filled circle'''
+        self._radial(cx, cy, radius, lambda d: radius + 0.5 - d, antialias)
+
+    def polygon(self, points: list[tuple[float, float]], *, antialias: bool = True):
+        '''Filled polygon, using the even-odd rule for self-intersections'''
+        if len(points) < 3:
+            return
+        edges = [
+            (x0, y0, x1, y1) if y0 < y1 else (x1, y1, x0, y0)
+            for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1])
+            if y0 != y1
+        ]
+        top = max(math.floor(min(y for _, y in points) + 0.5), 0)
+        bottom = min(math.ceil(max(y for _, y in points) + 0.5), self.height)
+
+        samples = POLYGON_SAMPLES if antialias else 1
+        for y in range(top, bottom):
+            if antialias:
+                row = [0.0] * self.width
+            for sample in range(samples):
+                sy = y - 0.5 + (sample + 0.5) / samples
+                crossings = sorted(x0 + (sy - y0) * (x1 - x0) / (y1 - y0) for x0, y0, x1, y1 in edges if y0 <= sy < y1)
+                # Shift by half a pixel so that pixel x covers [x, x + 1)
+                for left, right in zip(crossings[0::2], crossings[1::2]):
+                    if antialias:
+                        self._add_span(row, left + 0.5, right + 0.5, 1.0 / samples)
+                    else:
+                        self._fill_span(y, math.ceil(left), math.ceil(right))
+            if antialias:
+                self._merge_row(y, 0, row)
+
+    def _touch(self, first: int, stop: int):
+        if self._rows:
+            first = min(first, self._rows[0])
+            stop = max(stop, self._rows[1])
+        self._rows = (first, stop)
+
+    def _merge_row(self, y: int, x: int, values: list[float]):
+        '''Cover pixels of row y starting at x with alpha values (0-1), keeping the higher alpha'''
+        new = bytes(round(min(v, 1.0) * 255) if v > 0 else 0 for v in values)
+        if not any(new):
+            return
+        start = y * self.width + x
+        stop = start + len(new)
+        self.alpha[start:stop] = bytes(map(max, self.alpha[start:stop], new))
+        self._touch(y, y + 1)
+
+    def _fill_span(self, y: int, x0: int, x1: int):
+        x0 = max(x0, 0)
+        x1 = min(x1, self.width)
+        if x0 < x1:
+            start = y * self.width
+            self.alpha[start + x0:start + x1] = b"\xff" * (x1 - x0)
+            self._touch(y, y + 1)
+
+    def _add_span(self, row: list[float], left: float, right: float, weight: float):
+        '''Add weight times the covered fraction of each pixel of row between left and right'''
+        left = max(left, 0.0)
+        right = min(right, float(self.width))
+        if left >= right:
+            return
+        first = int(left)
+        last = int(right)
+        if first == last:
+            row[first] += (right - left) * weight
+            return
+        row[first] += (first + 1 - left) * weight
+        for x in range(first + 1, last):
+            row[x] += weight
+        if last < self.width:
+            row[last] += (right - last) * weight
+
+    def _radial(self, cx: float, cy: float, extent: float, coverage, antialias: bool):
+        '''Cover the pixels around (cx, cy) by coverage(distance to the center)'''
+        x0 = max(math.floor(cx - extent - 1), 0)
+        x1 = min(math.ceil(cx + extent + 2), self.width)
+        y0 = max(math.floor(cy - extent - 1), 0)
+        y1 = min(math.ceil(cy + extent + 2), self.height)
+        if x0 >= x1:
+            return
+        for y in range(y0, y1):
+            dy = y - cy
+            values = [coverage(math.hypot(x - cx, dy)) for x in range(x0, x1)]
+            if not antialias:
+                values = [1.0 if v >= 0.5 else 0.0 for v in values]
+            self._merge_row(y, x0, values)
+
+    def _bresenham(self, x0: int, y0: int, x1: int, y1: int):
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            self.plot(x0, y0)
+            if x0 == x1 and y0 == y1:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def _wu(self, x0: float, y0: float, x1: float, y1: float):
+        '''Xiaolin Wu's line, splitting each step between the two nearest pixels'''
+        steep = abs(y1 - y0) > abs(x1 - x0)
+        if steep:
+            x0, y0, x1, y1 = y0, x0, y1, x1
+        if x0 > x1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+
+        def plot(x, y, alpha):
+            if steep:
+                self.plot(y, x, alpha)
+            else:
+                self.plot(x, y, alpha)
+
+        dx = x1 - x0
+        gradient = (y1 - y0) / dx if dx else 1.0
+
+        # First end point
+        xend = round(x0)
+        yend = y0 + gradient * (xend - x0)
+        xgap = 1 - (x0 + 0.5 - math.floor(x0 + 0.5))
+        xstart = xend
+        ybase = math.floor(yend)
+        plot(xstart, ybase, (1 - (yend - ybase)) * xgap)
+        plot(xstart, ybase + 1, (yend - ybase) * xgap)
+        intery = yend + gradient
+
+        # Second end point
+        xend = round(x1)
+        yend = y1 + gradient * (xend - x1)
+        xgap = x1 + 0.5 - math.floor(x1 + 0.5)
+        xstop = xend
+        ybase = math.floor(yend)
+        plot(xstop, ybase, (1 - (yend - ybase)) * xgap)
+        plot(xstop, ybase + 1, (yend - ybase) * xgap)
+
+        for x in range(xstart + 1, xstop):
+            ybase = math.floor(intery)
+            plot(x, ybase, 1 - (intery - ybase))
+            plot(x, ybase + 1, intery - ybase)
+            intery += gradient
@@ -1,8 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+@dataclass
 class Event:
     """Base class for all events."""
-    pass
+
+    # perf_counter() time the event was posted to the app, see App.post_event
+    posted: float = field(default=0.0, kw_only=True, compare=False, repr=False)
 
 @dataclass
 class ButtonPressed(Event):
@@ -1,892 +1,392 @@
+'''
+Bitmap fonts, stored as one packed blob of glyph rows per font.
 
-from dataclasses import dataclass
+The default font covers ASCII, German umlauts and a few icons. Other Latin-1
+letters are shown as their base letter, anything else as a fallback glyph.
+'''
+
+from array import array
+import functools
+import unicodedata
 
 import pyleucht as pl
 
-@dataclass
+# Glyph index entry for code points a font does not cover
+NO_GLYPH = 0xFFFF
+
+# Number of strings whose metrics are kept by Font.metrics()
+METRICS_CACHE_SIZE = 256
+
 class Char:
-    rows: tuple[int, int, int, int, int]  # 5 rows, 5 bits each
-    width: int
+    '''A glyph: its width and its rows, row_bytes bytes per row with bit 7 of the first byte being the leftmost column'''
+    __slots__ = ("width", "rows", "row_bytes")
 
-    def is_set(self, p : pl.Point) -> bool:
-        # Outside vertical bounds
-        if p.y < 0 or p.y >= 5:
-            return False
+    def __init__(self, width: int, rows: bytes = b"", row_bytes: int = 1):
+        self.width = width
+        self.rows = rows
+        self.row_bytes = row_bytes
 
-        # Outside horizontal bounds (glyph width)
-        if p.x < 0 or p.x >= self.width:
+    def is_set(self, p : pl.Point) -> bool:
+        if p.x < 0 or p.x >= self.width or p.y < 0:
             return False
-
-        row = self.rows[p.y]
-
-        # Bit position: MSB (bit 4) is x == 0
-        bit = 4 - p.x
-
-        return bool((row >> bit) & 1)
-
-# Simple 5x5 font table for ASCII 0x21..0x7D (converted from font.h)
-simple_ascii_table: list[Char] = [
-    # 0x21 ('!')
-    Char((
-        0b10000,
-        0b10000,
-        0b10000,
-        0b00000,
-        0b10000,
-    ), 1),
-
-    # 0x22 ('"')
-    Char((
-        0b10100,
-        0b10100,
-        0b00000,
-        0b00000,
-        0b00000,
-    ), 3),
-
-    # 0x23 ('#')
-    Char((
-        0b01010,
-        0b11111,
-        0b01010,
-        0b11111,
-        0b01010,
-    ), 5),
-
-    # 0x24 ('$')
-    Char((
-        0b11100,
-        0b11000,
-        0b11100,
-        0b01100,
-        0b11100,
-    ), 3),
-
-    # 0x25 ('%')
-    Char((
-        0b10000,
-        0b00100,
-        0b01000,
-        0b10000,
-        0b00100,
-    ), 3),
-
-    # 0x26 ('&')
-    Char((
-        0b01100,
-        0b10010,
-        0b01100,
-        0b10010,
-        0b01110,
-    ), 4),
-
-    # 0x27 (''')
-    Char((
-        0b10000,
-        0b10000,
-        0b00000,
-        0b00000,
-        0b00000,
-    ), 1),
-
-    # 0x28 ('(')
-    Char((
-        0b01000,
-        0b10000,
-        0b10000,
-        0b10000,
-        0b01000,
-    ), 2),
-
-    # 0x29 (')')
-    Char((
-        0b10000,
-        0b01000,
-        0b01000,
-        0b01000,
-        0b10000,
-    ), 2),
-
-    # 0x2A ('*')
-    Char((
-        0b01000,
-        0b10100,
-        0b01000,
-        0b00000,
-        0b00000,
-    ), 3),
-
-    # 0x2B ('+')
-    Char((
-        0b00000,
-        0b01000,
-        0b11100,
-        0b01000,
-        0b00000,
-    ), 3),
-
-    # 0x2C (',')
-    Char((
-        0b00000,
-        0b00000,
-        0b00000,
-        0b01000,
-        0b11000,
-    ), 2),
-
-    # 0x2D ('-')
-    Char((
-        0b00000,
-        0b00000,
-        0b11100,
-        0b00000,
-        0b00000,
-    ), 3),
-
-    # 0x2E ('.')
-    Char((
-        0b00000,
-        0b00000,
-        0b00000,
-        0b00000,
-        0b10000,
-    ), 1),
-
-    # 0x2F ('/')
-    Char((
-        0b00100,
-        0b01000,
-        0b01000,
-        0b01000,
-        0b10000,
-    ), 3),
-
-    # 0x30 ('0')
-    Char((
-        0b11100,
-        0b10100,
-        0b10100,
-        0b10100,
-        0b11100,
-    ), 3),
-
-    # 0x31 ('1')
-    Char((
-        0b11000,
-        0b01000,
-        0b01000,
-        0b01000,
-        0b11100,
-    ), 3),
-
-    # 0x32 ('2')
-    Char((
-        0b11100,
-        0b00100,
-        0b11100,
-        0b10000,
-        0b11100,
-    ), 3),
-
-    # 0x33 ('3')
-    Char((
-        0b11100,
-        0b00100,
-        0b11100,
-        0b00100,
-        0b11100,
-    ), 3),
-
-    # 0x34 ('4')
-    Char((
-        0b10100,
-        0b10100,
-        0b11100,
-        0b00100,
-        0b00100,
-    ), 3),
-
-    # 0x35 ('5')
-    Char((
-        0b11100,
-        0b10000,
-        0b11100,
-        0b00100,
-        0b11100,
-    ), 3),
-
-    # 0x36 ('6')
-    Char((
-        0b11100,
-        0b10000,
-        0b11100,
-        0b10100,
-        0b11100,
-    ), 3),
-
-    # 0x37 ('7')
-    Char((
-        0b11100,
-        0b00100,
-        0b00100,
-        0b00100,
-        0b00100,
-    ), 3),
-
-    # 0x38 ('8')
-    Char((
-        0b11100,
-        0b10100,
-        0b11100,
-        0b10100,
-        0b11100,
-    ), 3),
-
-    # 0x39 ('9')
-    Char((
-        0b11100,
-        0b10100,
-        0b11100,
-        0b00100,
-        0b11100,
-    ), 3),
-
-    # 0x3A (':')
-    Char((
-        0b00000,
-        0b10000,
-        0b00000,
-        0b10000,
-        0b00000,
-    ), 1),
-    
-    # 0x3B (';')
-    Char((
-        0b00000,
-        0b10000,
-        0b00000,
-        0b10000,
-        0b10000,
-    ), 2),
-
-    # 0x3C ('<')
-    Char((
-        0b00100,
-        0b01000,
-        0b10000,
-        0b01000,
-        0b00100,
-    ), 3),
-
-    # 0x3D ('=')
-    Char((
-        0b00000,
-        0b11100,
-        0b00000,
-        0b11100,
-        0b00000,
-    ), 3),
-
-    # 0x3E ('>')
-    Char((
-        0b10000,
-        0b01000,
-        0b00100,
-        0b01000,
-        0b10000,
-    ), 3),
-
-    # 0x3F ('?')
-    Char((
-        0b11100,
-        0b00100,
-        0b01100,
-        0b00000,
-        0b01000,
-    ), 3),
-
-    # 0x40 ('@')
-    Char((
-        0b11100,
-        0b10100,
-        0b10100,
-        0b10000,
-        0b11100,
-    ), 3),
-
-    # 0x41 ('A')
-    Char((
-        0b11100,
-        0b10100,
-        0b11100,
-        0b10100,
-        0b10100,
-    ), 3),
-
-    # 0x42 ('B')
-    Char((
-        0b11100,
-        0b10100,
-        0b11000,
-        0b10100,
-        0b11100,
-    ), 3),
-
-    # 0x43 ('C')
-    Char((
-        0b11100,
-        0b10000,
-        0b10000,
-        0b10000,
-        0b11100,
-    ), 3),
-
-    # 0x44 ('D')
-    Char((
-        0b11000,
-        0b10100,
-        0b10100,
-        0b10100,
-        0b11000,
-    ), 3),
-
-    # 0x45 ('E')
-    Char((
-        0b11100,
-        0b10000,
-        0b11100,
-        0b10000,
-        0b11100,
-    ), 3),
-
-    # 0x46 ('F')
-    Char((
-        0b11100,
-        0b10000,
-        0b11100,
-        0b10000,
-        0b10000,
-    ), 3),
-
-    # 0x47 ('G')
-    Char((
-        0b11100,
-        0b10000,
-        0b10100,
-        0b10100,
-        0b11100,
-    ), 3),
-
-    # 0x48 ('H')
-    Char((
-        0b10100,
-        0b10100,
-        0b11100,
-        0b10100,
-        0b10100,
-    ), 3),
-
-    # 0x49 ('I')
-    Char((
-        0b11100,
-        0b01000,
-        0b01000,
-        0b01000,
-        0b11100,
-    ), 3),
-
-    # 0x4A ('J')
-    Char((
-        0b00100,
-        0b00100,
-        0b00100,
-        0b10100,
-        0b11100,
-    ), 3),
-
-    # 0x4B ('K')
-    Char((
-        0b10100,
-        0b10100,
-        0b11000,
-        0b10100,
-        0b10100,
-    ), 3),
-
-    # 0x4C ('L')
-    Char((
-        0b10000,
-        0b10000,
-        0b10000,
-        0b10000,
-        0b11100,
-    ), 3),
-
-    # 0x4D ('M')
-    Char((
-        0b11111,
-        0b10101,
-        0b10101,
-        0b10101,
-        0b10101,
-    ), 5),
-
-    # 0x4E ('N')
-    Char((
-        0b11100,
-        0b10100,
-        0b10100,
-        0b10100,
-        0b10100,
-    ), 3),
-
-    # 0x4F ('O')
-    Char((
-        0b11100,
-        0b10100,
-        0b10100,
-        0b10100,
-        0b01000,
-    ), 3),
-
-    # 0x50 ('P')
-    Char((
-        0b11100,
-        0b10100,
-        0b11100,
-        0b10000,
-        0b10000,
-    ), 3),
-
-    # 0x51 ('Q')
-    Char((
-        0b11100,
-        0b10100,
-        0b10100,
-        0b11100,
-        0b01000,
-    ), 3),
-
-    # 0x52 ('R')
-    Char((
-        0b11100,
-        0b10100,
-        0b11000,
-        0b10100,
-        0b10100,
-    ), 3),
-
-    # 0x53 ('S')
-    Char((
-        0b11100,
-        0b10000,
-        0b11100,
-        0b00100,
-        0b11100,
-    ), 3),
-
-    # 0x54 ('T')
-    Char((
-        0b11100,
-        0b01000,
-        0b01000,
-        0b01000,
-        0b01000,
-    ), 3),
-
-    # 0x55 ('U')
-    Char((
-        0b10100,
-        0b10100,
-        0b10100,
-        0b10100,
-        0b11100,
-    ), 3),
-
-    # 0x56 ('V')
-    Char((
-        0b10100,
-        0b10100,
-        0b10100,
-        0b10100,
-        0b01000,
-    ), 3),
-
-    # 0x57 ('W')
-    Char((
-        0b10101,
-        0b10101,
-        0b10101,
-        0b10101,
-        0b11111,
-    ), 5),
-
-    # 0x58 ('X')
-    Char((
-        0b10100,
-        0b10100,
-        0b01000,
-        0b10100,
-        0b10100,
-    ), 3),
-
-    # 0x59 ('Y')
-    Char((
-        0b10100,
-        0b10100,
-        0b11100,
-        0b01000,
-        0b01000,
-    ), 3),
-
-    # 0x5A ('Z')
-    Char((
-        0b11100,
-        0b00100,
-        0b01000,
-        0b10000,
-        0b11100,
-    ), 3),
-
-    # 0x5B ('[')
-    Char((
-        0b11000,
-        0b10000,
-        0b10000,
-        0b10000,
-        0b11000,
-    ), 2),
-
-    # 0x5C ('\')
-    Char((
-        0b10000,
-        0b01000,
-        0b01000,
-        0b01000,
-        0b00100,
-    ), 3),
-
-    # 0x5D (']')
-    Char((
-        0b11000,
-        0b01000,
-        0b01000,
-        0b01000,
-        0b11000,
-    ), 2),
-
-    # 0x5E ('^')
-    Char((
-        0b01000,
-        0b10100,
-        0b00000,
-        0b00000,
-        0b00000,
-    ), 3),
-
-    # 0x5F ('_')
-    Char((
-        0b00000,
-        0b00000,
-        0b00000,
-        0b00000,
-        0b11100,
-    ), 3),
-
-    # 0x60 ('`')
-    Char((
-        0b10000,
-        0b01000,
-        0b00000,
-        0b00000,
-        0b00000,
-    ), 2),
-
-    # 0x61 ('a')
-    Char((
-        0b00000,
-        0b01100,
-        0b10100,
-        0b10100,
-        0b01100,
-    ), 3),
-
-    # 0x62 ('b')
-    Char((
-        0b10000,
-        0b11000,
-        0b10100,
-        0b10100,
-        0b11000,
-    ), 3),
-
-    # 0x63 ('c')
-    Char((
-        0b00000,
-        0b11100,
-        0b10000,
-        0b10000,
-        0b11100,
-    ), 3),
-
-    # 0x64 ('d')
-    Char((
-        0b00100,
-        0b01100,
-        0b10100,
-        0b10100,
-        0b01100,
-    ), 3),
-
-    # 0x65 ('e')
-    Char((
-        0b00000,
-        0b01000,
-        0b10100,
-        0b11000,
-        0b01100,
-    ), 3),
-
-    # 0x66 ('f')
-    Char((
-        0b01100,
-        0b01000,
-        0b11100,
-        0b01000,
-        0b01000,
-    ), 3),
-
-    # 0x67 ('g')
-    Char((
-        0b11100,
-        0b10100,
-        0b11100,
-        0b00100,
-        0b11000,
-    ), 3),
-
-    # 0x68 ('h')
-    Char((
-        0b10000,
-        0b11000,
-        0b10100,
-        0b10100,
-        0b10100,
-    ), 3),
-
-    # 0x69 ('i')
-    Char((
-        0b10000,
-        0b00000,
-        0b10000,
-        0b10000,
-        0b10000,
-    ), 1),
-
-    # 0x6A ('j')
-    Char((
-        0b01000,
-        0b00000,
-        0b01000,
-        0b01000,
-        0b10000,
-    ), 2),
-
-    # 0x6B ('k')
-    Char((
-        0b10000,
-        0b10100,
-        0b11000,
-        0b10100,
-        0b10100,
-    ), 3),
-
-    # 0x6C ('l')
-    Char((
-        0b11000,
-        0b01000,
-        0b01000,
-        0b01000,
-        0b01000,
-    ), 2),
-
-    # 0x6D ('m')
-    Char((
-        0b00000,
-        0b11111,
-        0b10101,
-        0b10101,
-        0b10101,
-    ), 5),
-
-    # 0x6E ('n')
-    Char((
-        0b00000,
-        0b11100,
-        0b10100,
-        0b10100,
-        0b10100,
-    ), 3),
-
-    # 0x6F ('o')
-    Char((
-        0b00000,
-        0b11100,
-        0b10100,
-        0b10100,
-        0b11100,
-    ), 3),
-
-    # 0x70 ('p')
-    Char((
-        0b11000,
-        0b10100,
-        0b10100,
-        0b11000,
-        0b10000,
-    ), 3),
-
-    # 0x71 ('q')
-    Char((
-        0b01100,
-        0b10100,
-        0b10100,
-        0b01100,
-        0b00100,
-    ), 3),
-
-    # 0x72 ('r')
-    Char((
-        0b00000,
-        0b11100,
-        0b10100,
-        0b10000,
-        0b10000,
-    ), 3),
-
-    # 0x73 ('s')
-    Char((
-        0b00000,
-        0b01100,
-        0b10000,
-        0b00100,
-        0b11000,
-    ), 3),
-
-    # 0x74 ('t')
-    Char((
-        0b01000,
-        0b11100,
-        0b01000,
-        0b01000,
-        0b01100,
-    ), 3),
-
-    # 0x75 ('u')
-    Char((
-        0b00000,
-        0b10100,
-        0b10100,
-        0b10100,
-        0b11100,
-    ), 3),
-
-    # 0x76 ('v')
-    Char((
-        0b00000,
-        0b10100,
-        0b10100,
-        0b10100,
-        0b01000,
-    ), 3),
-
-    # 0x77 ('w')
-    Char((
-        0b00000,
-        0b10101,
-        0b10101,
-        0b10101,
-        0b11111,
-    ), 5),
-
-    # 0x78 ('x')
-    Char((
-        0b00000,
-        0b10100,
-        0b01000,
-        0b10100,
-        0b10100,
-    ), 3),
-
-    # 0x79 ('y')
-    Char((
-        0b10100,
-        0b10100,
-        0b11100,
-        0b00100,
-        0b11000,
-    ), 3),
-
-    # 0x7A ('z')
-    Char((
-        0b00000,
-        0b11100,
-        0b00100,
-        0b10000,
-        0b01100,
-    ), 3),
-
-    # 0x7B ('{')
-    Char((
-        0b01100,
-        0b01000,
-        0b11000,
-        0b01000,
-        0b01100,
-    ), 3),
-
-    # 0x7C ('|')
-    Char((
-        0b10000,
-        0b10000,
-        0b10000,
-        0b10000,
-        0b10000,
-    ), 1),
-
-    # 0x7D ('}')
-    Char((
-        0b11000,
-        0b01000,
-        0b01100,
-        0b01000,
-        0b11000,
-    ), 3),
-
-	# 0x7E ('~')
-    Char((
-    	0b00000,
-    	0b00000,
-    	0b01101,
-    	0b10110,
-    	0b00000,
-	), 5)
-]
-
-HEIGHT = 5
-INVALID_CHAR = Char([[False]*5 for _ in range(HEIGHT)], 0)
+        i = p.y * self.row_bytes + p.x // 8
+        return i < len(self.rows) and bool(self.rows[i] & (0x80 >> (p.x % 8)))
+
+    @property
+    def pixels(self) -> tuple[tuple[int, int], ...]:
+        '''(x, y) offsets of the set pixels'''
+        return tuple(
+            (x, y)
+            for y in range(len(self.rows) // self.row_bytes)
+            for x in range(self.width)
+            if self.rows[y * self.row_bytes + x // 8] & (0x80 >> (x % 8))
+        )
+
+
+class Metrics:
+    '''Horizontal layout of a string'''
+    __slots__ = ("width", "offsets")
+
+    def __init__(self, width: int, offsets: tuple[int, ...]):
+        self.width = width
+        self.offsets = offsets  # x position of every character
+
+
+class Font:
+    '''
+    A bitmap font.
+
+    All glyph rows live in one bytes blob, row_bytes bytes per row with bit 7 of
+    the first byte being the leftmost column. Code points map to glyphs through
+    dense index tables of 256 code points each. Glyphs are only unpacked into
+    Char instances when they are first used.
+    '''
+
+    def __init__(self, height: int, widths: bytes, bitmap: bytes, codes: list[int], *,
+                 fallback: int = None, spacing: int = 1, kerning: dict[tuple[str, str], int] = None):
+        '''
+        :param height: Glyph height in pixels
+        :param widths: Width of every glyph
+        :param bitmap: Rows of every glyph, glyph after glyph
+        :param codes: Code point of every glyph
+        :param fallback: Code point of the glyph shown for unavailable characters
+        :param spacing: Columns between two characters
+        :param kerning: Extra spacing (may be negative) for pairs of characters
+        '''
+        if len(widths) != len(codes) or not codes:
+            raise ValueError("Expected one width and one code point per glyph")
+        if len(bitmap) % (len(codes) * height):
+            raise ValueError("Bitmap size does not match the number of glyphs")
+
+        self.height = height
+        self.row_bytes = len(bitmap) // (len(codes) * height)
+        self.widths = bytes(widths)
+        self.bitmap = bytes(bitmap)
+        self.spacing = spacing
+        self.kerning = dict(kerning or {})
+
+        self._pages = {}
+        for glyph, code in enumerate(codes):
+            self._set_index(code, glyph)
+
+        self._chars = [None] * len(codes)
+        self.empty = Char(0)
+        self.fallback = self.empty
+        if fallback is not None:
+            self.fallback = self._char(self._glyph(fallback))
+
+    @classmethod
+    def from_glyphs(cls, height: int, glyphs: dict[int, tuple[int, list[tuple[int, int]]]], **kwargs) -> "Font":
+        '''Pack glyphs given as {code point: (width, [(x, y), ...])} into a font'''
+        row_bytes = max(1, (max(width for width, _ in glyphs.values()) + 7) // 8)
+        codes = sorted(glyphs)
+        bitmap = bytearray(len(codes) * height * row_bytes)
+        for glyph, code in enumerate(codes):
+            for x, y in glyphs[code][1]:
+                bitmap[(glyph * height + y) * row_bytes + x // 8] |= 0x80 >> (x % 8)
+        return cls(height, bytes(glyphs[code][0] for code in codes), bitmap, codes, **kwargs)
+
+    def _set_index(self, code: int, glyph: int):
+        page = self._pages.get(code >> 8)
+        if page is None:
+            page = self._pages[code >> 8] = array("H", [NO_GLYPH]) * 256
+        page[code & 0xFF] = glyph
+
+    def _glyph(self, code: int) -> int:
+        page = self._pages.get(code >> 8)
+        if page is None:
+            return NO_GLYPH
+        return page[code & 0xFF]
+
+    def _char(self, glyph: int) -> Char:
+        char = self._chars[glyph]
+        if char is None:
+            size = self.height * self.row_bytes
+            char = self._chars[glyph] = Char(self.widths[glyph], self.bitmap[glyph * size:(glyph + 1) * size], self.row_bytes)
+        return char
+
+    def alias(self, code: int, target: int):
+        '''Show the glyph of target for code'''
+        glyph = self._glyph(target)
+        if glyph == NO_GLYPH:
+            raise KeyError(f"No glyph for {target:#x}")
+        self._set_index(code, glyph)
+
+    def alias_latin1(self):
+        '''Show Latin-1 characters without a glyph of their own as their base letter, e.g. é as e'''
+        for code in range(0xA0, 0x100):
+            base = ord(unicodedata.normalize("NFKD", chr(code))[0])
+            if self._glyph(code) == NO_GLYPH and base != code and self._glyph(base) != NO_GLYPH:
+                self.alias(code, base)
+
+    def get_char(self, ch: str) -> Char:
+        '''Return the glyph for the first character of ch, or the fallback glyph if unavailable'''
+        if not ch:
+            return self.empty
+        glyph = self._glyph(ord(ch[0]))
+        if glyph == NO_GLYPH:
+            return self.fallback
+        return self._char(glyph)
+
+    def metrics(self, text: str) -> Metrics:
+        return _metrics(self, text)
+
+    def text_width(self, text: str) -> int:
+        return _metrics(self, text).width
+
+
+@functools.lru_cache(maxsize=METRICS_CACHE_SIZE)
+def _metrics(font: Font, text: str) -> Metrics:
+    offsets = []
+    x = 0
+    previous = None
+    for ch in text:
+        if previous is not None:
+            x += font.spacing + font.kerning.get((previous, ch), 0)
+        offsets.append(x)
+        x += font.get_char(ch).width
+        previous = ch
+    return Metrics(x, tuple(offsets))
+
+
+def load_bdf(path: str) -> Font:
+    '''Load a font from a BDF file'''
+    glyphs = {}
+    height = ascent = None
+    code = advance = bbx = rows = None
+    with open(path, encoding="latin-1") as f:
+        for line in f:
+            words = line.split()
+            if not words:
+                continue
+            keyword = words[0]
+            if rows is not None:
+                if keyword == "ENDCHAR":
+                    if code is not None and code >= 0:
+                        glyphs[code] = _bdf_glyph(rows, bbx, advance, height, ascent)
+                    rows = None
+                else:
+                    rows.append(keyword)
+            elif keyword == "FONTBOUNDINGBOX":
+                _, fh, _, fy = (int(word) for word in words[1:5])
+                height = fh
+                ascent = fh + fy
+            elif keyword == "STARTCHAR":
+                code = advance = bbx = None
+            elif keyword == "ENCODING":
+                code = int(words[1])
+            elif keyword == "DWIDTH":
+                advance = int(words[1])
+            elif keyword == "BBX":
+                bbx = tuple(int(word) for word in words[1:5])
+            elif keyword == "BITMAP":
+                rows = []
+
+    if height is None or not glyphs:
+        raise ValueError(f"{path}: not a BDF font or no glyphs")
+    return Font.from_glyphs(height, glyphs)
+
+def _bdf_glyph(rows: list[str], bbx: tuple[int, int, int, int], advance: int, height: int, ascent: int):
+    w, h, xoff, yoff = bbx
+    top = ascent - (h + yoff)
+    pixels = []
+    for y, row in enumerate(rows[:h]):
+        bits = int(row, 16)
+        size = len(row) * 4
+        for x in range(w):
+            px = x + xoff
+            py = y + top
+            if (bits >> (size - 1 - x)) & 1 and px >= 0 and 0 <= py < height:
+                pixels.append((px, py))
+    width = max(w + xoff, (advance or 0) - 1, 0)
+    return width, pixels
+
+
+# Icon glyphs of the default font, in the Unicode private use area
+ICON_HEART = "\ue000"
+ICON_UP = "\ue001"
+ICON_DOWN = "\ue002"
+ICON_LEFT = "\ue003"
+ICON_RIGHT = "\ue004"
+
+# Simple 5x5 font (ASCII converted from font.h, plus German umlauts and icons):
+# code point, width and five rows per glyph, bit 7 is the leftmost column
+_SIMPLE = bytes.fromhex(
+    "0020 02 00 00 00 00 00"  # ' '
+    "0021 01 80 80 80 00 80"  # '!'
+    "0022 03 a0 a0 00 00 00"  # '"'
+    "0023 05 50 f8 50 f8 50"  # '#'
+    "0024 03 e0 c0 e0 60 e0"  # '$'
+    "0025 03 80 20 40 80 20"  # '%'
+    "0026 04 60 90 60 90 70"  # '&'
+    "0027 01 80 80 00 00 00"  # "'"
+    "0028 02 40 80 80 80 40"  # '('
+    "0029 02 80 40 40 40 80"  # ')'
+    "002a 03 40 a0 40 00 00"  # '*'
+    "002b 03 00 40 e0 40 00"  # '+'
+    "002c 02 00 00 00 40 c0"  # ','
+    "002d 03 00 00 e0 00 00"  # '-'
+    "002e 01 00 00 00 00 80"  # '.'
+    "002f 03 20 40 40 40 80"  # '/'
+    "0030 03 e0 a0 a0 a0 e0"  # '0'
+    "0031 03 c0 40 40 40 e0"  # '1'
+    "0032 03 e0 20 e0 80 e0"  # '2'
+    "0033 03 e0 20 e0 20 e0"  # '3'
+    "0034 03 a0 a0 e0 20 20"  # '4'
+    "0035 03 e0 80 e0 20 e0"  # '5'
+    "0036 03 e0 80 e0 a0 e0"  # '6'
+    "0037 03 e0 20 20 20 20"  # '7'
+    "0038 03 e0 a0 e0 a0 e0"  # '8'
+    "0039 03 e0 a0 e0 20 e0"  # '9'
+    "003a 01 00 80 00 80 00"  # ':'
+    "003b 02 00 80 00 80 80"  # ';'
+    "003c 03 20 40 80 40 20"  # '<'
+    "003d 03 00 e0 00 e0 00"  # '='
+    "003e 03 80 40 20 40 80"  # '>'
+    "003f 03 e0 20 60 00 40"  # '?'
+    "0040 03 e0 a0 a0 80 e0"  # '@'
+    "0041 03 e0 a0 e0 a0 a0"  # 'A'
+    "0042 03 e0 a0 c0 a0 e0"  # 'B'
+    "0043 03 e0 80 80 80 e0"  # 'C'
+    "0044 03 c0 a0 a0 a0 c0"  # 'D'
+    "0045 03 e0 80 e0 80 e0"  # 'E'
+    "0046 03 e0 80 e0 80 80"  # 'F'
+    "0047 03 e0 80 a0 a0 e0"  # 'G'
+    "0048 03 a0 a0 e0 a0 a0"  # 'H'
+    "0049 03 e0 40 40 40 e0"  # 'I'
+    "004a 03 20 20 20 a0 e0"  # 'J'
+    "004b 03 a0 a0 c0 a0 a0"  # 'K'
+    "004c 03 80 80 80 80 e0"  # 'L'
+    "004d 05 f8 a8 a8 a8 a8"  # 'M'
+    "004e 03 e0 a0 a0 a0 a0"  # 'N'
+    "004f 03 e0 a0 a0 a0 40"  # 'O'
+    "0050 03 e0 a0 e0 80 80"  # 'P'
+    "0051 03 e0 a0 a0 e0 40"  # 'Q'
+    "0052 03 e0 a0 c0 a0 a0"  # 'R'
+    "0053 03 e0 80 e0 20 e0"  # 'S'
+    "0054 03 e0 40 40 40 40"  # 'T'
+    "0055 03 a0 a0 a0 a0 e0"  # 'U'
+    "0056 03 a0 a0 a0 a0 40"  # 'V'
+    "0057 05 a8 a8 a8 a8 f8"  # 'W'
+    "0058 03 a0 a0 40 a0 a0"  # 'X'
+    "0059 03 a0 a0 e0 40 40"  # 'Y'
+    "005a 03 e0 20 40 80 e0"  # 'Z'
+    "005b 02 c0 80 80 80 c0"  # '['
+    "005c 03 80 40 40 40 20"  # '\\'
+    "005d 02 c0 40 40 40 c0"  # ']'
+    "005e 03 40 a0 00 00 00"  # '^'
+    "005f 03 00 00 00 00 e0"  # '_'
+    "0060 02 80 40 00 00 00"  # '`'
+    "0061 03 00 60 a0 a0 60"  # 'a'
+    "0062 03 80 c0 a0 a0 c0"  # 'b'
+    "0063 03 00 e0 80 80 e0"  # 'c'
+    "0064 03 20 60 a0 a0 60"  # 'd'
+    "0065 03 00 40 a0 c0 60"  # 'e'
+    "0066 03 60 40 e0 40 40"  # 'f'
+    "0067 03 e0 a0 e0 20 c0"  # 'g'
+    "0068 03 80 c0 a0 a0 a0"  # 'h'
+    "0069 01 80 00 80 80 80"  # 'i'
+    "006a 02 40 00 40 40 80"  # 'j'
+    "006b 03 80 a0 c0 a0 a0"  # 'k'
+    "006c 02 c0 40 40 40 40"  # 'l'
+    "006d 05 00 f8 a8 a8 a8"  # 'm'
+    "006e 03 00 e0 a0 a0 a0"  # 'n'
+    "006f 03 00 e0 a0 a0 e0"  # 'o'
+    "0070 03 c0 a0 a0 c0 80"  # 'p'
+    "0071 03 60 a0 a0 60 20"  # 'q'
+    "0072 03 00 e0 a0 80 80"  # 'r'
+    "0073 03 00 60 80 20 c0"  # 's'
+    "0074 03 40 e0 40 40 60"  # 't'
+    "0075 03 00 a0 a0 a0 e0"  # 'u'
+    "0076 03 00 a0 a0 a0 40"  # 'v'
+    "0077 05 00 a8 a8 a8 f8"  # 'w'
+    "0078 03 00 a0 40 a0 a0"  # 'x'
+    "0079 03 a0 a0 e0 20 c0"  # 'y'
+    "007a 03 00 e0 20 80 60"  # 'z'
+    "007b 03 60 40 c0 40 60"  # '{'
+    "007c 01 80 80 80 80 80"  # '|'
+    "007d 03 c0 40 60 40 c0"  # '}'
+    "007e 05 00 00 68 b0 00"  # '~'
+    "00b0 03 40 a0 40 00 00"  # '°'
+    "00c4 03 a0 40 a0 e0 a0"  # 'Ä'
+    "00d6 03 a0 e0 a0 a0 40"  # 'Ö'
+    "00dc 03 a0 00 a0 a0 e0"  # 'Ü'
+    "00df 03 40 a0 c0 a0 c0"  # 'ß'
+    "00e4 03 a0 60 a0 a0 60"  # 'ä'
+    "00f6 03 a0 e0 a0 a0 e0"  # 'ö'
+    "00fc 03 a0 00 a0 a0 60"  # 'ü'
+    "e000 05 50 f8 f8 70 20"  # ICON_HEART
+    "e001 05 20 70 a8 20 20"  # ICON_UP
+    "e002 05 20 20 a8 70 20"  # ICON_DOWN
+    "e003 05 20 40 f8 40 20"  # ICON_LEFT
+    "e004 05 20 10 f8 10 20"  # ICON_RIGHT
+    "fffd 03 a0 40 a0 40 a0"  # REPLACEMENT
+)
+
+def _simple() -> Font:
+    glyph_size = 2 + 1 + 5
+    count = len(_SIMPLE) // glyph_size
+    codes = [(_SIMPLE[i] << 8) | _SIMPLE[i + 1] for i in range(0, len(_SIMPLE), glyph_size)]
+    bitmap = bytearray(count * 5)
+    for row in range(5):
+        bitmap[row::5] = _SIMPLE[row + 3::glyph_size]
+    font = Font(5, _SIMPLE[2::glyph_size], bitmap, codes, fallback=0xFFFD)
+    font.alias_latin1()
+    return font
+
+DEFAULT = _simple()
+HEIGHT = DEFAULT.height
+INVALID_CHAR = DEFAULT.empty
 
 def get_char(ch: str) -> Char:
-    """Return Char for ASCII characters in range 0x21..0x7D, or None if unavailable."""
-    if not ch:
-        return INVALID_CHAR
-    code = ord(ch[0])
-    #print(f"Getting character for: {ch} (code {hex(code)})")
-    if 0x21 <= code <= 0x7E:
-        return simple_ascii_table[code - 0x21]
-    return INVALID_CHAR
+    """Return Char of the default font, or its fallback glyph if unavailable."""
+    return DEFAULT.get_char(ch)
 
 def text_width(str: str) -> int:
-    character_width = sum(simple_ascii_table[ord(ch) - 0x21].width for ch in str)
-    spacing_width = len(str) - 1
-    return character_width + spacing_width
+    return DEFAULT.text_width(str)
+
+
+# Number of rendered strings kept by render()
+RENDER_CACHE_SIZE = 64
+
+class Bitmap:
+    '''Text rendered into a one bit per pixel strip'''
+    __slots__ = ("width", "rows")
+
+    def __init__(self, width: int, rows: tuple[bytes, ...]):
+        self.width = width
+        self.rows = rows  # One byte per column, 1 where a pixel is set
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def render(text: str, font: Font = None) -> Bitmap:
+    '''Render text into a bitmap, laid out by the font metrics.'''
+    font = font or DEFAULT
+    metrics = font.metrics(text)
+    width = metrics.width
+    rows = [bytearray(width) for _ in range(font.height)]
+    for ch, x in zip(text, metrics.offsets):
+        for cx, cy in font.get_char(ch).pixels:
+            if 0 <= x + cx < width:
+                rows[cy][x + cx] = 1
+
+    return Bitmap(width, tuple(bytes(row) for row in rows))
@@ -0,0 +1,160 @@
+'''
+A layout describes how the LEDs of a wall are wired, i.e. which screen pixel
+is driven by which position on the strip.
+
+The layout is compiled once. LEDs that follow the pixels at a constant step,
+like the rows of a serpentine grid or its columns, form runs that are copied
+into the wire buffer with a few slice assignments, without allocating.
+Irregular layouts fall back to a gather through a byte index table.
+'''
+
+import operator
+
+class Layout:
+    # Use runs if they need at most this many slice assignments per LED
+    MAX_SLICES_PER_LED = 0.25
+
+    def __init__(self, width: int, height: int, order: list[int]):
+        '''
+        :param width: Screen width in pixels
+        :param height: Screen height in pixels
+        :param order: Pixel index (y * width + x) for every LED, in wire order
+        '''
+        if not order:
+            raise ValueError("Layout must contain at least one LED")
+        if len(set(order)) != len(order):
+            raise ValueError("Layout maps a pixel to more than one LED")
+        for index in order:
+            if index < 0 or index >= width * height:
+                raise ValueError(f"Pixel index {index} outside of {width}x{height} screen")
+
+        self.width = width
+        self.height = height
+        self.order = tuple(order)
+        self.num_leds = len(order)
+
+        slices = self._slices()
+        if len(slices) <= self.num_leds * self.MAX_SLICES_PER_LED:
+            self._runs = slices
+            self._gather = None
+        else:
+            # One entry per output byte, pointing into the RGB framebuffer
+            self._runs = None
+            self._gather = operator.itemgetter(*(index * 3 + c for index in self.order for c in range(3)))
+
+    def _slices(self) -> list[tuple[slice, slice]]:
+        '''(wire, frame) byte slices of the runs of LEDs with a constant pixel step'''
+        slices = []
+        led = 0
+        while led < self.num_leds:
+            first = self.order[led]
+            step = self.order[led + 1] - first if led + 1 < self.num_leds else 1
+            count = 1
+            while led + count < self.num_leds and self.order[led + count] - self.order[led + count - 1] == step:
+                count += 1
+
+            if step == 1:
+                slices.append((slice(led * 3, (led + count) * 3), slice(first * 3, (first + count) * 3)))
+            else:
+                # One strided slice per channel
+                for c in range(3):
+                    start = first * 3 + c
+                    stop = start + count * step * 3
+                    slices.append((slice(led * 3 + c, (led + count) * 3, 3), slice(start, stop if stop >= 0 else None, step * 3)))
+            led += count
+        return slices
+
+    def pack(self, frame: bytes, out: bytearray):
+        '''Write the frame into out in wire order. out must hold num_leds * 3 bytes.'''
+        if self._runs is None:
+            out[:] = self._gather(frame)
+            return
+        with memoryview(frame) as source, memoryview(out) as wire:
+            for wire_slice, frame_slice in self._runs:
+                wire[wire_slice] = source[frame_slice]
+
+
+def grid(width: int, height: int, *, columns: bool = False, serpentine: bool = True,
+         rotate: int = 0, mirror_x: bool = False, mirror_y: bool = False) -> Layout:
+    '''
+    Build the layout of a rectangular panel.
+
+    The panel is wired row by row (or column by column) starting in its top-left
+    corner. It may be mounted rotated clockwise and/or mirrored.
+
+    :param columns: Wire runs along columns instead of rows
+    :param serpentine: Every other row (or column) runs in the opposite direction
+    :param rotate: Clockwise panel rotation in degrees (0, 90, 180 or 270)
+    :param mirror_x: Mirror the panel horizontally before rotating
+    :param mirror_y: Mirror the panel vertically before rotating
+    '''
+    if rotate not in (0, 90, 180, 270):
+        raise ValueError(f"Unsupported rotation: {rotate}")
+
+    # Panel dimensions before rotation
+    if rotate in (90, 270):
+        panel_w, panel_h = height, width
+    else:
+        panel_w, panel_h = width, height
+
+    if columns:
+        lines, length = panel_w, panel_h
+    else:
+        lines, length = panel_h, panel_w
+
+    order = []
+    for line in range(lines):
+        steps = range(length)
+        if serpentine and line % 2 == 1:
+            steps = reversed(steps)
+        for step in steps:
+            px, py = (line, step) if columns else (step, line)
+            if mirror_x:
+                px = panel_w - 1 - px
+            if mirror_y:
+                py = panel_h - 1 - py
+
+            if rotate == 0:
+                x, y = px, py
+            elif rotate == 90:
+                x, y = panel_h - 1 - py, px
+            elif rotate == 180:
+                x, y = panel_w - 1 - px, panel_h - 1 - py
+            else:
+                x, y = py, panel_w - 1 - px
+            order.append(y * width + x)
+
+    return Layout(width, height, order)
+
+
+def load(path: str, width: int, height: int) -> Layout:
+    '''
+    Load a layout from a mapping file for irregular walls.
+
+    The file contains one line per screen row with one whitespace separated
+    token per pixel: the position of the LED on the strip (starting at 0), or
+    '.' for a pixel without an LED. Empty lines and lines starting with '#'
+    are ignored.
+    '''
+    with open(path, encoding="utf-8") as f:
+        rows = [line.split() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+    if len(rows) != height:
+        raise ValueError(f"{path}: expected {height} rows, got {len(rows)}")
+
+    leds = {}
+    for y, row in enumerate(rows):
+        if len(row) != width:
+            raise ValueError(f"{path}: row {y} has {len(row)} entries, expected {width}")
+        for x, token in enumerate(row):
+            if token == ".":
+                continue
+            led = int(token)
+            if led in leds:
+                raise ValueError(f"{path}: LED {led} is mapped twice")
+            leds[led] = y * width + x
+
+    if sorted(leds) != list(range(len(leds))):
+        raise ValueError(f"{path}: LED positions must be numbered 0..{len(leds) - 1} without gaps")
+
+    return Layout(width, height, [leds[led] for led in range(len(leds))])
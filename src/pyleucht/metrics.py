@@ -0,0 +1,84 @@
+'''
+Metrics of a running app in the Prometheus text format.
+
+The server only reads the counters and histograms the frame loop keeps
+anyway (see pl.stats), on its own thread and when it is scraped, so the
+frame loop neither allocates nor locks for it.
+'''
+
+import http.server
+import threading
+
+import pyleucht as pl
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _histogram(lines: list[str], name: str, help: str, histogram: pl.stats.Histogram):
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} histogram")
+    total = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        total += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f'{name}_bucket{{le="{le}"}} {total}')
+    lines.append(f"{name}_sum {histogram.sum}")
+    lines.append(f"{name}_count {total}")
+
+def _metric(lines: list[str], name: str, kind: str, help: str, value):
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {kind}")
+    lines.append(f"{name} {value}")
+
+def render(app: pl.app.App) -> str:
+    '''Return the metrics of app in the Prometheus text format'''
+    stats = app.stats
+    screen = app.screen
+    lines = []
+    _metric(lines, "pyleucht_fps", "gauge", "Achieved frames per second over the recent frames", stats.fps())
+    _metric(lines, "pyleucht_frames_total", "counter", "Frames drawn", stats.frames)
+    _metric(lines, "pyleucht_frame_overruns_total", "counter", "Frames that finished after the next one was due", stats.overruns)
+    _histogram(lines, "pyleucht_frame_seconds", "Work time per frame, without waiting for the next one", stats.frame)
+    _histogram(lines, "pyleucht_input_latency_seconds", "Time from a button event to the first frame pushed after its dispatch", stats.latency)
+    _metric(lines, "pyleucht_event_queue_depth", "gauge", "Events waiting for dispatch", app.event_queue.qsize())
+    _metric(lines, "pyleucht_frames_skipped_total", "counter", "Unchanged frames that were not pushed to the output", screen.frames_skipped)
+    if isinstance(screen, pl.screen.WS2801):
+        _metric(lines, "pyleucht_ws2801_frames_sent_total", "counter", "Frames sent to the LED strip", screen.frames_sent)
+        _metric(lines, "pyleucht_ws2801_bytes_sent_total", "counter", "Bytes sent to the LED strip", screen.bytes_sent)
+        _metric(lines, "pyleucht_ws2801_frames_late_total", "counter", "Frames ready while the previous one was still being sent", screen.frames_late)
+        _metric(lines, "pyleucht_ws2801_frames_dropped_total", "counter", "Frames replaced by a newer one before they were sent", screen.frames_dropped)
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    '''HTTP server answering GET /metrics on a background thread'''
+
+    def __init__(self, app: pl.app.App, port: int, host: str = "127.0.0.1"):
+        '''
+        :param port: TCP port to listen on
+        :param host: Address to bind to, only the local host by default
+        '''
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render(app).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
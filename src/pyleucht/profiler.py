@@ -0,0 +1,157 @@
+'''
+Sampling profiler for the running frame loop.
+
+Once triggered, by SIGUSR1 or by holding the four corner buttons, a
+thread samples the stack of the frame loop for a while and writes a
+report to disk: where the time went per state, per animation and per
+function. Sampling happens on its own thread, so the frame loop runs
+unmodified and nothing needs to be restarted.
+
+A sample is attributed to the animation whose own method (e.g.
+Kaleidoscope.draw) is innermost on the stack.
+'''
+
+import collections
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+
+import pyleucht as pl
+
+DEFAULT_DURATION = 30.0
+DEFAULT_INTERVAL = 0.005
+
+# Buttons to hold at the same time to start profiling
+COMBO = frozenset((pl.button.BUTTON_TOP_LEFT, pl.button.BUTTON_BOTTOM_LEFT,
+                   pl.button.BUTTON_TOP_RIGHT, pl.button.BUTTON_BOTTOM_RIGHT))
+
+# Functions listed per report section
+TOP_FUNCTIONS = 25
+
+def _animation_codes() -> dict:
+    '''Code objects of the methods animation classes define themselves, to the class name'''
+    codes = {}
+    pending = list(pl.animation.Base.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        for value in vars(cls).values():
+            code = getattr(value, "__code__", None)
+            if code is not None:
+                codes[code] = cls.__name__
+    return codes
+
+def _location(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Profiler:
+    def __init__(self, app: pl.app.App, duration: float = DEFAULT_DURATION, interval: float = DEFAULT_INTERVAL,
+                 directory: str = None):
+        '''
+        :param duration: Seconds to profile once triggered
+        :param interval: Seconds between two samples
+        :param directory: Where reports are written, the temporary directory by default
+        '''
+        self.app = app
+        self.duration = duration
+        self.interval = interval
+        self.directory = directory or tempfile.gettempdir()
+        self.last_report = None
+        self._thread = None
+        self._pressed = set()
+
+    def install(self):
+        '''Start profiling on SIGUSR1 and on the button combination'''
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.start())
+
+        buttons = self.app.buttons
+        callback = buttons.callback
+
+        def combo_callback(button_id, pressed):
+            if pressed:
+                self._pressed.add(button_id)
+                if self._pressed >= COMBO:
+                    self.start()
+            else:
+                self._pressed.discard(button_id)
+            callback(button_id, pressed)
+
+        buttons.callback = combo_callback
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        '''Profile the next duration seconds, unless a profile is already being taken'''
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        print(f"Profiling the frame loop for {self.duration:g} s", flush=True)
+        codes = _animation_codes()
+        states = collections.Counter()
+        animations = collections.Counter()
+        own = collections.Counter()          # (state, function) the sample was taken in
+        cumulative = collections.Counter()   # (state, function) anywhere on the stack
+        samples = 0
+
+        end = time.monotonic() + self.duration
+        while time.monotonic() < end:
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(self.app.loop_thread_id)
+            if frame is None:
+                continue
+            state = type(self.app.state).__name__
+            samples += 1
+            states[state] += 1
+            own[state, _location(frame)] += 1
+
+            animation = None
+            seen = set()
+            while frame is not None:
+                if animation is None:
+                    animation = codes.get(frame.f_code)
+                location = _location(frame)
+                if location not in seen:
+                    seen.add(location)
+                    cumulative[state, location] += 1
+                frame = frame.f_back
+            animations[state, animation or "(none)"] += 1
+
+        self.last_report = self._write(samples, states, animations, own, cumulative)
+        print(f"Profile written to {self.last_report}", flush=True)
+
+    def _write(self, samples: int, states, animations, own, cumulative) -> str:
+        path = os.path.join(self.directory, time.strftime("pyleucht-profile-%Y%m%d-%H%M%S.txt"))
+
+        def percent(count: int) -> str:
+            return f"{count * 100 / samples:6.1f}%" if samples else "     -"
+
+        lines = [f"{samples} samples every {self.interval * 1000:.1f} ms over {self.duration:g} s", ""]
+        lines.append("States")
+        for state, count in states.most_common():
+            lines.append(f"  {percent(count)}  {state}")
+
+        for state, _ in states.most_common():
+            lines += ["", f"State {state}", "  Animations"]
+            for (s, animation), count in animations.most_common():
+                if s == state:
+                    lines.append(f"    {percent(count)}  {animation}")
+            for title, counter in (("Own time", own), ("Cumulative time", cumulative)):
+                lines.append(f"  {title}")
+                entries = [(location, count) for (s, location), count in counter.most_common() if s == state]
+                for location, count in entries[:TOP_FUNCTIONS]:
+                    lines.append(f"    {percent(count)}  {location}")
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
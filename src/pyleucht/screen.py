@@ -1,34 +1,237 @@
 import time
+import threading
 import pyleucht as pl
 
+SPIDEV_BUFSIZ_PATH = "/sys/module/spidev/parameters/bufsiz"
+SPIDEV_DEFAULT_BUFSIZ = 4096
+
+# Translate table turning a 1-bit source byte (any non-zero value is set) into a mask byte
+_MASK_BYTES = bytes([0x00] + [0xFF] * 255)
+
+def spidev_bufsiz() -> int:
+    """Return the largest transfer the spidev kernel driver accepts at once."""
+    try:
+        with open(SPIDEV_BUFSIZ_PATH) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return SPIDEV_DEFAULT_BUFSIZ
+
 class Base:
     width: int
     height: int
-    pixels: list[pl.RGB]
+    frame: bytearray
 
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, refresh_interval: float = 1.0):
+        """
+        :param refresh_interval: Seconds after which an unchanged frame is sent again anyway
+        """
         self.width = width
         self.height = height
+        self.refresh_interval = refresh_interval
+        # Seconds between two updates at most, for screens that read input in update()
+        self.poll_interval = None
+        self.bbox = pl.BBox(pl.Point(0, 0), pl.Point(width, height))
 
-        # Initialize all pixels to black
-        self.pixels = [
-            [(0, 0, 0) for _ in range(self.width)]
-            for _ in range(self.height)
-        ]
+        # Row-major framebuffer with three bytes (R, G, B) per pixel, initialized to black
+        self.frame = bytearray(width * height * 3)
+
+        # Copy of the frame that was shown last, to skip pushing unchanged frames
+        self._shown = bytearray(len(self.frame))
+        self._shown_at = float("-inf")
+        self.frames_skipped = 0
 
     def fill(self, color: pl.RGB):
-        for y in range(self.height):
-            for x in range(self.width):
-                self.pixels[y][x] = color
+        self.frame[:] = color.to_bytes() * (self.width * self.height)
 
     def set(self, pos: pl.Point, color: pl.RGB):
         if pos.y < 0 or pos.y >= self.height:
             return
         if pos.x < 0 or pos.x >= self.width:
             return
-        self.pixels[pos.y][pos.x] = color
+        i = (pos.y * self.width + pos.x) * 3
+        frame = self.frame
+        frame[i] = color.r & 0xFF
+        frame[i + 1] = color.g & 0xFF
+        frame[i + 2] = color.b & 0xFF
+
+    def set_xy(self, x: int, y: int, color: pl.RGB):
+        """Same as set, for callers that keep coordinates as plain integers."""
+        if y < 0 or y >= self.height:
+            return
+        if x < 0 or x >= self.width:
+            return
+        i = (y * self.width + x) * 3
+        frame = self.frame
+        frame[i] = color.r & 0xFF
+        frame[i + 1] = color.g & 0xFF
+        frame[i + 2] = color.b & 0xFF
+
+    def get(self, pos: pl.Point) -> pl.RGB:
+        i = (pos.y * self.width + pos.x) * 3
+        return pl.RGB(*self.frame[i:i + 3])
+
+    def load(self, data: bytes):
+        """Replace the whole frame with packed RGB data of the same size."""
+        if len(data) != len(self.frame):
+            raise ValueError(f"Expected {len(self.frame)} bytes, got {len(data)}")
+        self.frame[:] = data
+
+    def write(self, pos: pl.Point, data: bytes):
+        """Write a run of packed RGB pixels into row pos.y, starting at pos.x."""
+        span = self._span(pos, len(data) // 3)
+        if span:
+            start, stop, skip = span
+            self.frame[start:stop] = data[skip:skip + stop - start]
+
+    def fill_rect(self, bbox: pl.BBox, color: pl.RGB):
+        """Fill a rectangle, clipped to the screen."""
+        rect = self._clip(bbox.min.x, bbox.min.y, bbox.width, bbox.height)
+        if rect:
+            self._fill_rows(self.frame, rect, color.to_bytes())
+
+    def blit(self, pos: pl.Point, data: bytes, width: int):
+        """Copy packed RGB rows of width pixels each, with their top-left corner at pos."""
+        rect = self._clip(pos.x, pos.y, width, len(data) // (width * 3))
+        if rect:
+            self._copy_rows(self.frame, rect, pos, data, width)
+
+    def blit_mask(self, pos: pl.Point, rows: list[bytes], color: pl.RGB):
+        """
+        Draw color wherever a 1-bit source is set, e.g. a rendered text bitmap.
+
+        :param pos: Top-left corner of the source
+        :param rows: One byte per column and row, non-zero where a pixel is set
+        """
+        pixel = color.to_bytes()
+        for start, stop, mask in self._mask_rows(pos, rows):
+            self._merge(self.frame, start, stop, pixel * ((stop - start) // 3), mask)
+
+    def blit_alpha(self, pos: pl.Point, alpha: bytes, width: int, color: pl.RGB):
+        """
+        Draw color with a per-pixel alpha, e.g. antialiased shapes from pl.draw.
+
+        :param pos: Top-left corner of the source
+        :param alpha: One byte (0-255) per pixel, in rows of width pixels
+        """
+        for start, stop, row in self._alpha_rows(pos, alpha, width):
+            self._blend_row(start, stop, row, color)
+
+    def _clip(self, x: int, y: int, width: int, height: int) -> tuple[int, int, int, int] | None:
+        """Clip a rectangle to the screen, returning (x0, y0, x1, y1) or None if nothing is left."""
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + width, self.width)
+        y1 = min(y + height, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    def _fill_rows(self, buffer: bytearray, rect: tuple[int, int, int, int], pixel: bytes):
+        x0, y0, x1, y1 = rect
+        stride = self.width * 3
+        if x0 == 0 and x1 == self.width:
+            # Full rows are contiguous in the frame
+            buffer[y0 * stride:y1 * stride] = pixel * ((y1 - y0) * self.width)
+            return
+        run = pixel * (x1 - x0)
+        for start in range(y0 * stride + x0 * 3, y1 * stride, stride):
+            buffer[start:start + len(run)] = run
+
+    def _copy_rows(self, buffer: bytearray, rect: tuple[int, int, int, int], pos: pl.Point, data: bytes, width: int):
+        x0, y0, x1, y1 = rect
+        stride = self.width * 3
+        source_stride = width * 3
+        count = (x1 - x0) * 3
+        if x0 == 0 and x1 == self.width == width:
+            buffer[y0 * stride:y1 * stride] = data[(y0 - pos.y) * source_stride:(y1 - pos.y) * source_stride]
+            return
+        source = memoryview(data)
+        skip = (y0 - pos.y) * source_stride + (x0 - pos.x) * 3
+        for start in range(y0 * stride + x0 * 3, y1 * stride, stride):
+            buffer[start:start + count] = source[skip:skip + count]
+            skip += source_stride
+
+    def _mask_rows(self, pos: pl.Point, rows: list[bytes]):
+        """Yield the frame start and stop offset and the byte mask of every visible row of a 1-bit source."""
+        if not rows:
+            return
+        rect = self._clip(pos.x, pos.y, len(rows[0]), len(rows))
+        if not rect:
+            return
+        x0, y0, x1, y1 = rect
+        stride = self.width * 3
+        for y in range(y0, y1):
+            bits = rows[y - pos.y][x0 - pos.x:x1 - pos.x].translate(_MASK_BYTES)
+            if not any(bits):
+                continue
+            mask = self._expand(bits)
+            start = y * stride + x0 * 3
+            yield start, start + len(mask), mask
+
+    def _alpha_rows(self, pos: pl.Point, alpha: bytes, width: int):
+        """Yield the frame start and stop offset and the alpha bytes of every visible, non-transparent row."""
+        rect = self._clip(pos.x, pos.y, width, len(alpha) // width)
+        if not rect:
+            return
+        x0, y0, x1, y1 = rect
+        stride = self.width * 3
+        for y in range(y0, y1):
+            skip = (y - pos.y) * width - pos.x
+            row = alpha[skip + x0:skip + x1]
+            if not any(row):
+                continue
+            start = y * stride + x0 * 3
+            yield start, start + len(row) * 3, row
+
+    def _blend_row(self, start: int, stop: int, alpha: bytes, color: pl.RGB):
+        frame = self.frame
+        for channel, value in enumerate(color.to_bytes()):
+            dst = frame[start + channel:stop:3]
+            frame[start + channel:stop:3] = pl.blend.tint(dst, alpha, value)
+
+    @staticmethod
+    def _expand(bits: bytes) -> bytearray:
+        """Repeat every byte three times, turning one byte per pixel into one per channel."""
+        expanded = bytearray(len(bits) * 3)
+        expanded[0::3] = expanded[1::3] = expanded[2::3] = bits
+        return expanded
+
+    @staticmethod
+    def _merge(buffer: bytearray, start: int, stop: int, data: bytes, mask: bytes):
+        """Replace the bytes of buffer[start:stop] with those of data where mask is set."""
+        mask = int.from_bytes(mask, "little")
+        merged = (int.from_bytes(data, "little") & mask) | (int.from_bytes(buffer[start:stop], "little") & ~mask)
+        buffer[start:stop] = merged.to_bytes(stop - start, "little")
+
+    def _span(self, pos: pl.Point, count: int) -> tuple[int, int, int] | None:
+        """
+        Clip a run of count pixels in row pos.y, starting at pos.x, to the screen.
+        Return its start and stop offset in the frame and the number of bytes cut off on the left.
+        """
+        if pos.y < 0 or pos.y >= self.height:
+            return None
+        x0 = max(pos.x, 0)
+        x1 = min(pos.x + count, self.width)
+        if x0 >= x1:
+            return None
+        row = pos.y * self.width
+        return (row + x0) * 3, (row + x1) * 3, (x0 - pos.x) * 3
+
+    def invalidate(self):
+        """Force the next update to push the frame, even if it did not change."""
+        self._shown_at = float("-inf")
 
     def update(self):
+        """Push the frame to the output, unless it is unchanged and the refresh interval has not passed."""
+        now = time.monotonic()
+        if self.frame == self._shown and now - self._shown_at < self.refresh_interval:
+            self.frames_skipped += 1
+            return
+        self._shown[:] = self.frame
+        self._shown_at = now
+        self.show()
+
+    def show(self):
         raise NotImplementedError("Subclasses must implement this method.")
 
     def points(self):
@@ -37,15 +240,141 @@ class Base:
             for x in range(self.width):
                 yield pl.Point(x, y)
 
+class Layer(Base):
+    """
+    Off-screen frame that also records how much of every pixel was drawn,
+    so that it can be composited over another screen.
+    """
+
+    def __init__(self, width: int, height: int):
+        super().__init__(width, height)
+        self.mask = bytearray(len(self.frame))  # Coverage of every byte, 0xFF where it was drawn opaquely
+        self.partial = False  # Whether mask holds coverage other than 0 and 0xFF
+
+    def clear(self):
+        self.frame[:] = bytes(len(self.frame))
+        self.mask[:] = bytes(len(self.mask))
+        self.partial = False
+
+    def fill(self, color: pl.RGB):
+        super().fill(color)
+        self.mask[:] = b"\xff" * len(self.mask)
+        self.partial = False
+
+    def set(self, pos: pl.Point, color: pl.RGB):
+        self.set_xy(pos.x, pos.y, color)
+
+    def set_xy(self, x: int, y: int, color: pl.RGB):
+        if y < 0 or y >= self.height:
+            return
+        if x < 0 or x >= self.width:
+            return
+        super().set_xy(x, y, color)
+        i = (y * self.width + x) * 3
+        self.mask[i:i + 3] = b"\xff\xff\xff"
+
+    def load(self, data: bytes):
+        super().load(data)
+        self.mask[:] = b"\xff" * len(self.mask)
+        self.partial = False
+
+    def write(self, pos: pl.Point, data: bytes):
+        span = self._span(pos, len(data) // 3)
+        if span:
+            start, stop, skip = span
+            self.frame[start:stop] = data[skip:skip + stop - start]
+            self.mask[start:stop] = b"\xff" * (stop - start)
+
+    def fill_rect(self, bbox: pl.BBox, color: pl.RGB):
+        rect = self._clip(bbox.min.x, bbox.min.y, bbox.width, bbox.height)
+        if rect:
+            self._fill_rows(self.frame, rect, color.to_bytes())
+            self._fill_rows(self.mask, rect, b"\xff\xff\xff")
+
+    def blit(self, pos: pl.Point, data: bytes, width: int):
+        rect = self._clip(pos.x, pos.y, width, len(data) // (width * 3))
+        if rect:
+            self._copy_rows(self.frame, rect, pos, data, width)
+            self._fill_rows(self.mask, rect, b"\xff\xff\xff")
+
+    def blit_mask(self, pos: pl.Point, rows: list[bytes], color: pl.RGB):
+        pixel = color.to_bytes()
+        for start, stop, mask in self._mask_rows(pos, rows):
+            self._merge(self.frame, start, stop, pixel * ((stop - start) // 3), mask)
+            self._cover(start, stop, mask)
+
+    def blit_alpha(self, pos: pl.Point, alpha: bytes, width: int, color: pl.RGB):
+        for start, stop, row in self._alpha_rows(pos, alpha, width):
+            coverage = pl.blend.tint(self.mask[start:stop:3], row, 255)
+            self._blend_row(start, stop, pl.blend.lookup(pl.blend.over_table(), coverage, row), color)
+            self.mask[start:stop] = self._expand(coverage)
+            self.partial = True
+
+    def _cover(self, start: int, stop: int, mask: bytes):
+        """Mark the bytes of mask as drawn."""
+        covered = int.from_bytes(self.mask[start:stop], "little") | int.from_bytes(mask, "little")
+        self.mask[start:stop] = covered.to_bytes(stop - start, "little")
+
+    def composite(self, screen: Base):
+        """Copy the drawn pixels onto screen, which must have the same size."""
+        if self.partial:
+            screen.frame[:] = pl.blend.mix(screen.frame, self.frame, self.mask)
+            return
+        if self.mask.find(0) == -1:
+            screen.frame[:] = self.frame
+            return
+        mask = int.from_bytes(self.mask, "little")
+        frame = (int.from_bytes(self.frame, "little") & mask) | (int.from_bytes(screen.frame, "little") & ~mask)
+        screen.frame[:] = frame.to_bytes(len(screen.frame), "little")
+
+    def show(self):
+        pass
+
+
+class Headless(Base):
+    """
+    In-memory screen without any output, for benchmarks and tests.
+    With a layout, every shown frame is packed into wire order like on the LED strip.
+    """
+
+    def __init__(self, width: int, height: int, layout: pl.layout.Layout = None, refresh_interval: float = 1.0):
+        super().__init__(width, height, refresh_interval)
+        self.layout = layout
+        self.wire = bytearray(layout.num_leds * 3) if layout else None
+        self.frames_shown = 0
+
+    def show(self):
+        if self.layout:
+            self.layout.pack(self.frame, self.wire)
+        self.frames_shown += 1
+
+
 class WS2801(Base):
     """ WS2801-based screen using raw SPI """
 
-    def __init__(self, width: int, height: int, bus: int = 0, device: int = 0, speed_hz: int = 1_000_000):
-        super().__init__(width, height)
+    LATCH_DELAY = 0.002
+
+    def __init__(self, width: int, height: int, bus: int = 0, device: int = 0, speed_hz: int = 1_000_000,
+                 layout: pl.layout.Layout = None, threaded: bool = False, refresh_interval: float = 1.0):
+        """
+        :param layout: LED wiring, defaults to rows in serpentine order
+        :param threaded: Shift frames out on a background thread while the next one renders
+        :param refresh_interval: Seconds after which an unchanged frame is sent again anyway
+        """
+        super().__init__(width, height, refresh_interval)
 
         print("Initializing WS2801 LED strip (SPI)...")
 
-        self.num_leds = width * height
+        # Default wiring: rows in serpentine order, starting top-left
+        if layout is None:
+            layout = pl.layout.grid(width, height)
+        if layout.width != width or layout.height != height:
+            raise ValueError(f"Layout is {layout.width}x{layout.height}, screen is {width}x{height}")
+        self.layout = layout
+        self.num_leds = layout.num_leds
+        self._bufsiz = spidev_bufsiz()
+        self._back = self._wire_buffer()
+
         try:
             import spidev
         except ImportError as e:
@@ -55,30 +384,80 @@ class WS2801(Base):
         self._spi.open(bus, device)
         self._spi.max_speed_hz = speed_hz
 
-    def update(self):
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.frames_late = 0  # Frame was ready while the previous one was still being sent
+        self.frames_dropped = 0  # Frame was replaced by a newer one before it was sent
+
+        self._thread = None
+        if threaded:
+            self._front = self._wire_buffer()
+            self._pending = False
+            self._busy = False
+            self._closing = False
+            self._cond = threading.Condition()
+            self._thread = threading.Thread(target=self._output_loop, name="ws2801-output", daemon=True)
+            self._thread.start()
+
+    def _wire_buffer(self) -> tuple[bytearray, list[memoryview]]:
+        """Return a wire buffer and views into it, each small enough for a single spidev transfer."""
+        data = bytearray(self.num_leds * 3)
+        view = memoryview(data)
+        return data, [view[i:i + self._bufsiz] for i in range(0, len(data), self._bufsiz)]
+
+    def show(self):
         """
         Push the pixel buffer to the WS2801 strip.
-        WS2801 expects raw RGB bytes.
+        WS2801 expects raw RGB bytes in wire order.
         """
-        data = bytearray()
+        if self._thread is None:
+            self.layout.pack(self.frame, self._back[0])
+            self._transmit(self._back[1])
+            return
 
-        # Extend data and consider that the strip is wired in serpentine order
-        for y in range(self.height):
-            if y % 2 == 0:
-                # even row: left to right
-                for x in range(self.width):
-                    p = self.pixels[y][x]
-                    data.extend((p.r & 0xFF, p.g & 0xFF, p.b & 0xFF))
-            else:
-                # odd row: right to left
-                for x in reversed(range(self.width)):
-                    p = self.pixels[y][x]
-                    data.extend((p.r & 0xFF, p.g & 0xFF, p.b & 0xFF))
-
-        self._spi.xfer2(list(data))
-        time.sleep(0.002)  # Latch delay
+        with self._cond:
+            if self._pending:
+                self.frames_dropped += 1
+            elif self._busy:
+                self.frames_late += 1
+            self.layout.pack(self.frame, self._back[0])
+            self._pending = True
+            self._cond.notify()
+
+    def _output_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                self._front, self._back = self._back, self._front
+                self._pending = False
+                self._busy = True
+
+            self._transmit(self._front[1])
+
+            with self._cond:
+                self._busy = False
+
+    def _transmit(self, chunks: list[memoryview]):
+        start = time.perf_counter()
+        # Write-only transfers straight from the wire buffer; no readback needed
+        for chunk in chunks:
+            self._spi.writebytes2(chunk)
+        time.sleep(self.LATCH_DELAY)
+        self.frames_sent += 1
+        self.bytes_sent += self.num_leds * 3
+        tracer = pl.trace.active
+        if tracer is not None:
+            tracer.span("ws2801 transfer", "screen", start, time.perf_counter())
 
     def close(self):
+        if self._thread is not None:
+            with self._cond:
+                self._closing = True
+                self._cond.notify()
+            self._thread.join()
         self._spi.close()
 
 
@@ -90,10 +469,17 @@ class Debug(Base):
     BUTTON_HEIGHT = 30
     BUTTON_WIDTH = 30
 
-    def __init__(self, width: int, height: int, buttons: pl.button.DebugHandler, pixel_size: int = 20):
+    def __init__(self, width: int, height: int, buttons: pl.button.DebugHandler, pixel_size: int = 20, led_dots: bool = False):
+        """
+        :param pixel_size: Size of an LED in the window, in window pixels
+        :param led_dots: Draw LEDs as round dots instead of filling the whole pixel
+        """
         super().__init__(width, height)
+        # Keyboard and mouse are only read in update(), so keep updating while the frame is static
+        self.poll_interval = 0.02
         self._pixel_size = pixel_size
         self._buttons = buttons
+        self._led_states = None
 
         try:
             import pygame
@@ -110,6 +496,7 @@ class Debug(Base):
             self._pygame.K_5,
             self._pygame.K_6,
         ]
+        self._button_indices = {key: i for i, key in enumerate(self.BUTTON_KEYS)}
 
         # positions for the six buttons: left top/bottom, middle top/bottom, right top/bottom
         self._button_positions = [
@@ -120,52 +507,70 @@ class Debug(Base):
             (width * self._pixel_size - self.BUTTON_WIDTH, height * self._pixel_size),
             (width * self._pixel_size - self.BUTTON_WIDTH, height * self._pixel_size + self.BUTTON_HEIGHT),
         ]
+        self._button_rects = [self._pygame.Rect(x, y, self.BUTTON_WIDTH, self.BUTTON_HEIGHT) for x, y in self._button_positions]
 
         self._pygame.init()
         self.surface = self._pygame.display.set_mode((self.width * self._pixel_size, self.height * self._pixel_size + 2 * self.BUTTON_HEIGHT))
         self._pygame.display.set_caption('Emulated LED Wall')
 
-    def update(self):
+        # The frame is uploaded as a surface of one pixel per LED and scaled up in a single blit
+        self._wall_size = (self.width * self._pixel_size, self.height * self._pixel_size)
+        frame = self._pygame.image.frombuffer(self.frame, (self.width, self.height), "RGB")
+        self._scaled = self._pygame.Surface(self._wall_size, 0, frame)  # Same pixel format, as scale() requires
+        self._dots = self._dot_mask() if led_dots else None
+
+    def _dot_mask(self):
+        '''Black overlay with a transparent round hole for every LED'''
+        mask = self._pygame.Surface(self._wall_size, self._pygame.SRCALPHA)
+        mask.fill((0, 0, 0, 255))
+        radius = self._pixel_size * 0.4
         for y in range(self.height):
             for x in range(self.width):
-                color = self.pixels[y][x]
-                rect = self._pygame.Rect(x * self._pixel_size, y * self._pixel_size, self._pixel_size, self._pixel_size)
-                self._pygame.draw.rect(self.surface, color.to_tuple(), rect)
-        
+                center = ((x + 0.5) * self._pixel_size, (y + 0.5) * self._pixel_size)
+                self._pygame.draw.circle(mask, (0, 0, 0, 0), center, radius)
+        return mask
+
+    def update(self):
+        # Button LEDs are part of the window but not of the frame
+        led_states = [self._buttons.get_led_state(i) for i in range(6)]
+        if led_states != self._led_states:
+            self._led_states = led_states
+            self.invalidate()
+
+        super().update()
+        self._handle_events()
+
+    def show(self):
+        frame = self._pygame.image.frombuffer(self.frame, (self.width, self.height), "RGB")
+        self._pygame.transform.scale(frame, self._wall_size, self._scaled)
+        self.surface.blit(self._scaled, (0, 0))
+        if self._dots is not None:
+            self.surface.blit(self._dots, (0, 0))
+
         # Buttons can also be on or off based on their LED state
-        for i in range(6):
-            x, y = self._button_positions[i]
-            rect = self._pygame.Rect(x, y, self.BUTTON_WIDTH, self.BUTTON_HEIGHT)
-            color = self.COLOR_BUTTON_ON if self._buttons.get_led_state(i) else self.COLOR_BUTTON_OFF
-            self._pygame.draw.rect(self.surface, color, rect)
+        for rect, on in zip(self._button_rects, self._led_states):
+            self._pygame.draw.rect(self.surface, self.COLOR_BUTTON_ON if on else self.COLOR_BUTTON_OFF, rect)
 
         self._pygame.display.flip()
 
+    def _handle_events(self):
         # Handle events: support window close, keyboard 1-6, and mouse clicks on simulated buttons
         for event in self._pygame.event.get():
             if event.type == self._pygame.QUIT:
                 self._pygame.quit()
                 exit()
             if event.type == self._pygame.KEYDOWN:
-                if event.key in self.BUTTON_KEYS:
-                    index = self.BUTTON_KEYS.index(event.key)
-                    self._buttons.callback(index, True)
+                if event.key in self._button_indices:
+                    self._buttons.callback(self._button_indices[event.key], True)
             if event.type == self._pygame.KEYUP:
-                if event.key in self.BUTTON_KEYS:
-                    index = self.BUTTON_KEYS.index(event.key)
-                    self._buttons.callback(index, False)
+                if event.key in self._button_indices:
+                    self._buttons.callback(self._button_indices[event.key], False)
 
             if event.type == self._pygame.MOUSEBUTTONDOWN:
-                mx, my = event.pos
-                for i in range(len(self.BUTTON_KEYS)):
-                    x, y = self._button_positions[i]
-                    rect = self._pygame.Rect(x, y, self.BUTTON_WIDTH, self.BUTTON_HEIGHT)
-                    if rect.collidepoint(mx, my):
+                for i, rect in enumerate(self._button_rects):
+                    if rect.collidepoint(event.pos):
                         self._buttons.callback(i, True)
             if event.type == self._pygame.MOUSEBUTTONUP:
-                mx, my = event.pos
-                for i in range(len(self.BUTTON_KEYS)):
-                    x, y = self._button_positions[i]
-                    rect = self._pygame.Rect(x, y, self.BUTTON_WIDTH, self.BUTTON_HEIGHT)
-                    if rect.collidepoint(mx, my):
+                for i, rect in enumerate(self._button_rects):
+                    if rect.collidepoint(event.pos):
                         self._buttons.callback(i, False)
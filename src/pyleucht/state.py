@@ -20,6 +20,8 @@ class Base:
         self.screen = screen
         self.buttons = buttons
         self.animations = []
+        self.compositor = pl.compositor.Compositor()
+        self.stats = None  # Frame stats to record into, set by the app
 
     def on_enter(self):
         self.buttons.set_all_leds(False)
@@ -30,10 +32,13 @@ class Base:
     def on_frame(self):
         pass
 
+    def rate(self) -> int:
+        '''Frame rate the state needs, see pl.animation.Rate'''
+        return max((animation.rate() for animation in self.animations), default=pl.animation.Rate.STATIC)
+
     def update(self, dt):
         self.on_frame()
-        for animation in self.animations:
-            animation.update(self.screen, dt)
+        self.compositor.update(self.screen, self.animations, dt, self.stats)
 
     def handle_event(self, event: type[pl.event.Event]):
         if isinstance(event, pl.event.ButtonPressed):
@@ -61,7 +66,7 @@ class Idle(Base):
 
     def on_frame(self):
         self.idle += 1
-        if self.idle > self.MAX_IDLE_FRAMES:
+        if self.idle == self.MAX_IDLE_FRAMES + 1:
             self.animations.clear()
             self.animations.append(pl.animation.FillColor(pl.RGB(0, 0, 0)))
 
@@ -162,6 +167,7 @@ class TableTennis(Base):
             
             self.labels[player].text = str(score)
             self.labels[player].pos.x = self._label_offset_x(self.labels[player].text, player)
+            self.labels[player].invalidate()
             if not self.game_over:
                 if score >= 11 and (score - opponent_score) >= 2:
                     self.game_over = True
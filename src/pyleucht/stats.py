@@ -0,0 +1,118 @@
+'''
+Frame timing statistics.
+
+The frame loop records how long each of its sections took into histograms
+with fixed buckets. Recording only updates preallocated arrays, so it does
+not grow any containers or take locks in the frame loop. Every histogram
+also keeps a window of its most recent samples, from which means and
+percentiles are computed when a report is requested.
+'''
+
+import array
+import bisect
+import math
+import time
+
+# Upper bounds of the histogram buckets in seconds
+BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1, 0.25, 0.5, 1.0, math.inf)
+
+# Number of recent samples kept per histogram
+WINDOW = 1000
+
+class Histogram:
+    '''Durations in seconds, counted per bucket since start and kept for a window of recent samples'''
+
+    def __init__(self, window: int = WINDOW, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = array.array("Q", bytes(8 * len(buckets)))  # Samples per bucket since start
+        self.count = 0
+        self.sum = 0.0
+        self._window = array.array("d", bytes(8 * window))
+        self._next = 0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self._window[self._next] = seconds
+        self._next = (self._next + 1) % len(self._window)
+
+    def recent(self) -> list[float]:
+        '''The most recent samples, oldest first'''
+        if self.count < len(self._window):
+            return self._window[:self.count].tolist()
+        return (self._window[self._next:] + self._window[:self._next]).tolist()
+
+    def recent_counts(self) -> list[int]:
+        '''Samples per bucket within the window'''
+        counts = [0] * len(self.buckets)
+        for seconds in self.recent():
+            counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        return counts
+
+    def mean(self) -> float:
+        recent = self.recent()
+        return sum(recent) / len(recent) if recent else 0.0
+
+    def percentile(self, percent: float) -> float:
+        recent = sorted(self.recent())
+        if not recent:
+            return 0.0
+        return recent[min(len(recent) - 1, round(percent / 100 * (len(recent) - 1)))]
+
+
+class FrameStats:
+    '''Timings of the frame loop, see App.stats'''
+
+    def __init__(self, detailed: bool = False):
+        '''
+        :param detailed: Also time every animation, which costs a little per animation and frame
+        '''
+        self.detailed = detailed
+        self.frames = 0
+        self.overruns = 0  # Frames that finished after the next one was due
+        self.interval = Histogram()    # From the start of a frame to the start of the next one
+        self.frame = Histogram()       # Work of a frame, without waiting for the next one
+        self.events = Histogram()      # Dispatch of a single event
+        self.update = Histogram()      # state.update, including compositing
+        self.compositor = Histogram()  # Compositor.update
+        self.screen = Histogram()      # screen.update, i.e. pushing the frame
+        self.latency = Histogram()     # From posting an event to pushing the first frame after its dispatch
+        self.animations = {}           # Animation name to Histogram, only if detailed
+        self.started = time.perf_counter()
+
+    def animation(self, name: str) -> Histogram:
+        histogram = self.animations.get(name)
+        if histogram is None:
+            histogram = self.animations[name] = Histogram()
+        return histogram
+
+    def fps(self) -> float:
+        '''Achieved frame rate over the recent frames'''
+        mean = self.interval.mean()
+        return 1.0 / mean if mean else 0.0
+
+    def sections(self) -> list[tuple[str, Histogram]]:
+        return [
+            ("frame", self.frame),
+            ("events", self.events),
+            ("update", self.update),
+            ("compositor", self.compositor),
+            ("screen", self.screen),
+            ("input latency", self.latency),
+            *sorted((f"animation {name}", histogram) for name, histogram in self.animations.items()),
+        ]
+
+    def report(self) -> str:
+        sections = [(name, histogram) for name, histogram in self.sections() if histogram.count]
+        width = max((len(name) for name, _ in sections), default=0)
+        lines = [
+            f"{self.frames} frames, {self.fps():.1f} fps, {self.overruns} overruns",
+            f"{'section':<{width}} {'count':>8} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}",
+        ]
+        for name, histogram in sections:
+            lines.append(
+                f"{name:<{width}} {histogram.count:>8} {histogram.mean() * 1000:>9.3f} {histogram.percentile(50) * 1000:>9.3f} "
+                f"{histogram.percentile(99) * 1000:>9.3f} {histogram.percentile(100) * 1000:>9.3f}"
+            )
+        return "\n".join(lines)
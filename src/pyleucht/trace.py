@@ -0,0 +1,121 @@
+'''
+Timeline of the frame loop in the Chrome trace event format.
+
+While a tracer is active, the app records every frame, state update,
+animation update, screen push, WS2801 transfer, garbage collection and
+button event (from posting to dispatch) with its start and end. Events
+are appended to the trace file as they are recorded, so memory stays
+flat however long the trace runs. The file opens in chrome://tracing or
+https://ui.perfetto.dev, even if the process died before closing it.
+
+Tracing is opt-in (--trace PATH); without an active tracer the hooks
+cost a single attribute check.
+'''
+
+import atexit
+import gc
+import json
+import os
+import threading
+import time
+
+# Tracer the hooks record into, if any, see start()
+active = None
+
+# Bytes buffered before they are written to the trace file
+BUFFER_SIZE = 64 * 1024
+
+def _us(seconds: float) -> float:
+    return seconds * 1e6
+
+
+class Tracer:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "wb", buffering=BUFFER_SIZE)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._names = {}       # Name to its JSON string
+        self._threads = set()  # Threads named in the trace so far
+        self._gc = []          # Garbage collections not yet written, see _on_gc
+        self._flows = 0
+        self._gc_start = None
+        self._closed = False
+        # JSON array format, which viewers accept without the closing bracket
+        self._file.write(b"[" + self._metadata("process_name", None, "pyleucht")[1:])
+
+    def _json(self, name: str) -> str:
+        encoded = self._names.get(name)
+        if encoded is None:
+            encoded = self._names[name] = json.dumps(name)
+        return encoded
+
+    def _metadata(self, name: str, thread: int | None, value: str) -> bytes:
+        tid = f',"tid":{thread}' if thread is not None else ""
+        return f',\n{{"ph":"M","name":"{name}","pid":{self._pid}{tid},"args":{{"name":{json.dumps(value)}}}}}'.encode()
+
+    def _write(self, event: str):
+        thread = threading.get_ident()
+        with self._lock:
+            if self._closed:
+                return
+            if thread not in self._threads:
+                self._threads.add(thread)
+                self._file.write(self._metadata("thread_name", thread, threading.current_thread().name))
+            while self._gc:
+                self._file.write(self._gc.pop(0).encode())
+            self._file.write(event.encode())
+
+    def span(self, name: str, category: str, start: float, end: float):
+        '''Record a complete event from start to end (perf_counter seconds) on the current thread'''
+        self._write(self._span(name, category, start, end, threading.get_ident()))
+
+    def _span(self, name: str, category: str, start: float, end: float, thread: int) -> str:
+        return (f',\n{{"ph":"X","name":{self._json(name)},"cat":{self._json(category)},"ts":{_us(start):.3f},'
+                f'"dur":{_us(end - start):.3f},"pid":{self._pid},"tid":{thread}}}')
+
+    def flow(self, name: str, category: str, start: float, end: float):
+        '''Record an asynchronous event, e.g. a button event from being posted to its dispatch'''
+        self._flows += 1
+        common = f'"name":{self._json(name)},"cat":{self._json(category)},"id":{self._flows},"pid":{self._pid},"tid":{threading.get_ident()}'
+        self._write(f',\n{{"ph":"b",{common},"ts":{_us(start):.3f}}},\n{{"ph":"e",{common},"ts":{_us(end):.3f}}}')
+
+    def _on_gc(self, phase: str, info: dict):
+        # Runs in the middle of any allocation, possibly while an event is
+        # being written, so only queue the event for the next write
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            self._gc.append(self._span(f"gc gen {info['generation']}", "gc", self._gc_start, time.perf_counter(),
+                                       threading.get_ident()))
+            self._gc_start = None
+
+    def close(self):
+        '''Finish the trace file'''
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for event in self._gc:
+                self._file.write(event.encode())
+            self._file.write(b"\n]\n")
+            self._file.close()
+
+
+def start(path: str) -> Tracer:
+    '''Start recording into a new tracer writing to path, finished on exit at the latest'''
+    global active
+    tracer = Tracer(path)
+    gc.callbacks.append(tracer._on_gc)
+    atexit.register(tracer.close)
+    active = tracer
+    return tracer
+
+def stop():
+    '''Stop recording and finish the trace'''
+    global active
+    if active is not None:
+        active.close()
+        active = None
@@ -0,0 +1,107 @@
+'''
+Watchdog for stalls of the frame loop.
+
+The app records a heartbeat after every frame (App.heartbeat). A thread
+checks it, and if no frame completed for longer than the stall threshold,
+it logs the stacks of all threads together with the active state and its
+animations, once per stall.
+
+When run by systemd with WatchdogSec=, the watchdog also sends the
+keep-alive notifications, but only while heartbeats arrive, so systemd
+restarts a frozen process. The ready notification of Type=notify units is
+sent by notify(), with or without a watchdog.
+'''
+
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+
+import pyleucht as pl
+
+def _notify_address() -> str | None:
+    address = os.environ.get("NOTIFY_SOCKET")
+    if address and address.startswith("@"):
+        # Abstract socket namespace
+        address = "\0" + address[1:]
+    return address
+
+def notify(message: str):
+    '''Send a notification to systemd, if it started this process with a notify socket'''
+    address = _notify_address()
+    if not address:
+        return
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.sendto(message.encode("ascii"), address)
+    except OSError as e:
+        logging.warning("systemd notification failed: %s", e)
+
+def _systemd_interval() -> float | None:
+    '''Seconds between two keep-alive notifications, or None if systemd does not watch this process'''
+    usec = os.environ.get("WATCHDOG_USEC")
+    pid = os.environ.get("WATCHDOG_PID")
+    if not usec or (pid and int(pid) != os.getpid()):
+        return None
+    # Notify twice per period, as systemd recommends
+    return int(usec) / 1e6 / 2
+
+
+class Watchdog:
+    def __init__(self, app: pl.app.App, stall_after: float = 10.0):
+        '''
+        :param stall_after: Seconds without a completed frame after which the loop counts as stalled
+        '''
+        self.app = app
+        self.stall_after = stall_after
+        self.stalls = 0
+        # An idle loop would otherwise wait up to the screen refresh interval between frames
+        app.max_wait = stall_after / 2
+
+        self._systemd_interval = _systemd_interval() if _notify_address() else None
+
+        self._interval = min(stall_after / 4, self._systemd_interval or stall_after)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="watchdog", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        notify("STOPPING=1")
+
+    def _run(self):
+        stalled_since = None
+        while not self._stop.wait(self._interval):
+            now = time.perf_counter()
+            heartbeat = self.app.heartbeat
+            if now - heartbeat <= self.stall_after:
+                if stalled_since is not None:
+                    logging.warning("Frame loop resumed after %.1f s", now - stalled_since)
+                    stalled_since = None
+                if self._systemd_interval:
+                    notify("WATCHDOG=1")
+                continue
+
+            if stalled_since is None:
+                stalled_since = heartbeat
+                self.stalls += 1
+                logging.error("Frame loop stalled for %.1f s\n%s", now - heartbeat, self.report())
+
+    def report(self) -> str:
+        '''The active state, its animations and the stacks of all threads'''
+        state = self.app.state
+        lines = [f"State: {type(state).__name__}", "Animations:"]
+        for animation in list(state.animations):
+            lines.append(f"  {type(animation).__name__} rate={animation.rate()} version={animation.version}")
+
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == threading.get_ident():
+                continue
+            lines.append(f"Thread {names.get(ident, ident)}:")
+            lines.extend(line.rstrip("\n") for line in traceback.format_stack(frame))
+        return "\n".join(lines)